@@ -1,7 +1,26 @@
 from options import parse_args
-from utils import extract_text_from_file, parse_content, generate_filename
+from utils import (extract_text_from_file, parse_content, prefetch_parses, generate_filename, configure_ocr,
+                   configure_extraction, configure_prompt, configure_fast_path)
+from matcher import load_reference_data
+from cache import file_digest, open_caches
+from llm_client import configure_client, get_client
+from results import build_record, open_results_sink
+from extract_pool import ExtractPool
+from output import materialize
+from dedup import DuplicateIndex, DuplicateResolver
+from journal import JOURNAL_FILENAME, Journal, iter_resume_files, load_journal, watch_resume_files
+from metrics import FileMetrics, collector, stage, track_file
+from logs import log_context, setup_logging
+import logging
+import multiprocessing
 import os
-import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from collections import deque
+from itertools import islice
+
+logger = logging.getLogger("ResumeCLT")
 
 # Summary dictionary to keep track of metrics
 summary = {
@@ -19,12 +38,16 @@ summary = {
     "NonChineseName": 0,
     "QS50": 0
 }
+# Guards `summary` when resumes are processed by several workers at once
+summary_lock = threading.Lock()
+
+# Duplicate and near-duplicate resumes of this run (set up in main unless --no-dedup)
+duplicate_index = None
 
 def handle_file_error(file, args, error_message, file_num, total_files):
     error_filename = f"ERROR - {os.path.basename(file)}"
-    error_filepath = os.path.join(args.output_dir, error_filename)
-    shutil.copyfile(file, error_filepath)  # Ensure file is copied to the output directory
-    return False, f"Error {file_num}/{total_files} encountered an issue: {error_message} ❌"
+    materialize(file, args.output_dir, error_filename, args.output_mode)  # Ensure file is in the output directory
+    return False, f"Error {file_num}/{total_files} encountered an issue: {error_message} ❌", {"error": error_message}
 
 def map_education_level(chinese_level):
     """Map Chinese education level to the English labels used in the summary logic."""
@@ -38,6 +61,10 @@ def map_education_level(chinese_level):
         return "N/A"
 
 def update_summary(parsed_info):
+    with summary_lock:
+        _update_summary(parsed_info)
+
+def _update_summary(parsed_info):
     # Determine award status
     award_status = parsed_info.get("award_status", "")
     if award_status == "竞赛人才":
@@ -92,88 +119,377 @@ def update_summary(parsed_info):
     if parsed_info.get("is_qs50", "") == "QS50":
         summary["QS50"] += 1
 
-def process_file(file, args, qs50_list, file_num, total_files):
-    print(f"\n-------------------------------------------------------------------------------------")
-    print(f"[DEBUG] Starting to process file {file_num}/{total_files}: {file}")
+def extract_stage(file, args, caches, file_num, total_files):
+    """Extract the text of one resume. Returns (text_content, None), or (None, error result)."""
+    logger.debug("Starting to process file %s/%s: %s", file_num, total_files, file)
+
+    # Byte-identical copies of an earlier resume are not extracted again
+    digest = None
+    if duplicate_index:
+        try:
+            digest = file_digest(file)
+        except OSError as e:
+            return None, handle_file_error(file, args, f"Error reading file: {e}", file_num, total_files)
+        original = duplicate_index.claim_file(file, digest)
+        if original:
+            return None, defer_duplicate(file, original, 1.0, file_num, total_files)
 
     # Extract text from file
     try:
-        text_content = extract_text_from_file(file)
+        with stage("extract"):
+            text_content = extract_text_from_file(file, cache=caches.text, digest=digest)
         if not text_content.strip():
-            return handle_file_error(file, args, "No text extracted from the resume.", file_num, total_files)
+            return None, handle_file_error(file, args, "No text extracted from the resume.", file_num, total_files)
     except Exception as e:
-        return handle_file_error(file, args, f"Error extracting text: {e}", file_num, total_files)
+        return None, handle_file_error(file, args, f"Error extracting text: {e}", file_num, total_files)
 
-    print("[DEBUG] Successfully extracted text. Now sending to OpenAI for parsing...")
+    logger.debug("Successfully extracted text. Now sending to OpenAI for parsing...")
+    return text_content, None
 
-    # If target_list is provided, read the file
-    target_school_list = []
-    if args.target_list:
-        try:
-            with open(args.target_list, 'r', encoding='utf-8') as f:
-                target_school_list = [x.strip() for x in f.readlines()]
-            print(f"[DEBUG] Loaded {len(target_school_list)} target schools from {args.target_list}")
-        except Exception as e:
-            return handle_file_error(file, args, f"Error reading target school list: {e}", file_num, total_files)
-
-    # Load award lists similarly...
-    award_list = []
-    if args.award_list:
-        try:
-            with open(args.award_list, 'r', encoding='utf-8') as f:
-                award_list = [x.strip() for x in f.readlines()]
-            print(f"[DEBUG] Loaded {len(award_list)} items from award list 1: {args.award_list}")
-        except Exception as e:
-            return handle_file_error(file, args, f"Error reading award list: {e}", file_num, total_files)
-        
-    award_list2 = []
-    if args.award_list2:
-        try:
-            with open(args.award_list2, 'r', encoding='utf-8') as f:
-                award_list2 = [x.strip() for x in f.readlines()]
-            print(f"[DEBUG] Loaded {len(award_list2)} items from award list 2: {args.award_list2}")
-        except Exception as e:
-            return handle_file_error(file, args, f"Error reading award list2: {e}", file_num, total_files)
+def process_file(file, args, references, caches, file_num, total_files):
+    file_metrics = FileMetrics(file)
+    with log_context(file_num, file), track_file(file_metrics), stage("total"):
+        text_content, error = extract_stage(file, args, caches, file_num, total_files)
+        if error:
+            success, result, details = error
+        else:
+            success, result, details = finish_file(file, text_content, args, references, caches, file_num, total_files)
+    return success, result, attach_metrics(details, file_metrics)
+
+def attach_metrics(details, file_metrics):
+    """Add a resume's stage timings and usage counters to its details and to the run totals."""
+    details["timings"] = file_metrics.timings()
+    details["usage"] = file_metrics.usage()
+    collector.add(file_metrics)
+    return details
+
+def finish_file(file, text_content, args, references, caches, file_num, total_files, parsed_fields=None):
+    """Parse and match already-extracted text, then copy the resume under its new name."""
+    if duplicate_index:
+        match = duplicate_index.claim_text(file, text_content)
+        if match:
+            return defer_duplicate(file, *match, file_num, total_files)
 
     # Parse content
     try:
-        print("[DEBUG] Parsing resume content with local matching + partial OpenAI matching if needed...")
-        parsed_info = parse_content(text_content, target_school_list, award_list, award_list2, qs50_list)
+        logger.debug("Parsing resume content with local matching + partial OpenAI matching if needed...")
+        parsed_info = parse_content(text_content, references, caches=caches, parsed_fields=parsed_fields)
         if not parsed_info:
             return handle_file_error(file, args, "Parsed content is empty.", file_num, total_files)
     except Exception as e:
         return handle_file_error(file, args, f"Error with AlexAI response: {e}", file_num, total_files)
 
     # Show partial parse_info for debugging
-    print("[DEBUG] parse_content returned these fields:")
-    print(f"        Name: {parsed_info.get('name')}")
-    print(f"        Education Level: {parsed_info.get('education_level')}")
-    print(f"        Schools: PhD={parsed_info.get('phd_school')} | Master={parsed_info.get('master_school')} | Bachelor={parsed_info.get('bachelor_school')}")
-    print(f"        Match Status: PhD={parsed_info.get('phd_match_status')}, Master={parsed_info.get('master_match_status')}, Bachelor={parsed_info.get('bachelor_match_status')}")
-    print(f"        Awards: {parsed_info.get('awards')}")
-    print(f"        Award Status: {parsed_info.get('award_status')}")
-    print(f"        is_chinese_name: {parsed_info.get('is_chinese_name')}")
-    print(f"        is_qs50: {parsed_info.get('is_qs50')}")
+    logger.debug(
+        "parse_content returned: Name=%s | Education Level=%s | Schools: PhD=%s, Master=%s, Bachelor=%s | "
+        "Match Status: PhD=%s, Master=%s, Bachelor=%s | Awards=%s | Award Status=%s | is_chinese_name=%s | is_qs50=%s",
+        parsed_info.get('name'), parsed_info.get('education_level'),
+        parsed_info.get('phd_school'), parsed_info.get('master_school'), parsed_info.get('bachelor_school'),
+        parsed_info.get('phd_match_status'), parsed_info.get('master_match_status'), parsed_info.get('bachelor_match_status'),
+        parsed_info.get('awards'), parsed_info.get('award_status'), parsed_info.get('is_chinese_name'), parsed_info.get('is_qs50'),
+    )
 
     # Generate the new filename
     file_extension = os.path.splitext(file)[1]
     try:
         filename = f"{generate_filename(parsed_info, args)}{file_extension}"
-        print(f"[DEBUG] Final filename generated: {filename}")
+        logger.debug("Final filename generated: %s", filename)
 
         if not os.path.exists(args.output_dir):
-            os.makedirs(args.output_dir)
-            print(f"[DEBUG] Created output directory: {args.output_dir}")
+            os.makedirs(args.output_dir, exist_ok=True)
+            logger.debug("Created output directory: %s", args.output_dir)
+
+        with stage("output"):
+            filename = materialize(file, args.output_dir, filename, args.output_mode)
 
-        shutil.copyfile(file, os.path.join(args.output_dir, filename))
-        
         update_summary(parsed_info)
-        return True, f"Done {file_num}/{total_files} with no problems ✅"
+        return True, f"Done {file_num}/{total_files} with no problems ✅", {"output_file": filename, "parsed_info": parsed_info}
 
     except Exception as e:
         return handle_file_error(file, args, f"Error renaming file: {e}", file_num, total_files)
 
 
+def process_batch(batch, args, references, caches, total_files, executor=None):
+    """
+    Process a list of (file_num, file) in three steps: extract every resume, parse the
+    short ones with a few batched OpenAI requests (prefetch_parses), then match, rename
+    and copy each one. Anything without a valid batched result is parsed on its own.
+    Returns one result per file, in the order of `batch`.
+    """
+    run = executor.map if executor else map
+    file_metrics = {file_num: FileMetrics(file) for file_num, file in batch}
+
+    def extract(item):
+        file_num, file = item
+        with log_context(file_num, file), track_file(file_metrics[file_num]), stage("total"):
+            return extract_stage(file, args, caches, file_num, total_files)
+
+    extracted = list(run(extract, batch))
+    todo = [(file_num, file, text) for (file_num, file), (text, error) in zip(batch, extracted) if not error]
+
+    finished = iter(finish_batch(todo, args, references, caches, total_files, file_metrics, run))
+    # Results in the same order as `batch`
+    results = [error if error else next(finished) for _, error in extracted]
+    return [(success, result, attach_metrics(details, file_metrics[file_num]))
+            for (file_num, _), (success, result, details) in zip(batch, results)]
+
+def finish_batch(todo, args, references, caches, total_files, file_metrics, run=map):
+    """
+    Parse a list of extracted (file_num, file, text), sharing OpenAI requests between them
+    when --parse_batch_size > 1 (prefetch_parses), then match, rename and copy each one.
+    `file_metrics` maps file_num to the resume's FileMetrics. Returns results in order.
+    """
+    # Near-duplicates are left out of the shared parsing requests
+    deferred = {}
+    if duplicate_index:
+        for file_num, file, text in todo:
+            match = duplicate_index.claim_text(file, text)
+            if match:
+                deferred[file_num] = defer_duplicate(file, *match, file_num, total_files)
+
+    prefetched = {}
+    if args.parse_batch_size > 1:
+        start = time.perf_counter()
+        prefetched = prefetch_parses({str(file_num): text for file_num, _, text in todo if file_num not in deferred},
+                                     caches, batch_size=args.parse_batch_size, max_chars=args.parse_batch_max_chars)
+        # Every resume in the batch waited for the shared parsing requests; their tokens count toward the run totals
+        elapsed = time.perf_counter() - start
+        for file_num, _, _ in todo:
+            if file_num not in deferred:
+                file_metrics[file_num].stages["parse"] += elapsed
+                file_metrics[file_num].stages["total"] += elapsed
+
+    def finish(item):
+        file_num, file, text = item
+        with log_context(file_num, file), track_file(file_metrics[file_num]), stage("total"):
+            return finish_file(file, text, args, references, caches, file_num, total_files,
+                               parsed_fields=prefetched.get(str(file_num)))
+
+    finished = iter(list(run(finish, [item for item in todo if item[0] not in deferred])))
+    return [deferred[file_num] if file_num in deferred else next(finished) for file_num, _, _ in todo]
+
+def defer_duplicate(file, original, similarity, file_num, total_files):
+    """
+    Result of a resume that duplicates `original`: success is None until DuplicateResolver
+    sees the original's outcome and finishes it with finish_duplicate.
+    """
+    logger.info("Duplicate of %s (%.0f%% similar), reusing its result", original, similarity * 100)
+    return None, f"Duplicate {file_num}/{total_files}", {"duplicate_of": original, "similarity": round(similarity, 3),
+                                                         "file_num": file_num, "total_files": total_files}
+
+def finish_duplicate(file, original_outcome, args, details):
+    """Give a duplicate the parsed fields and name of its original, without counting it in the summary."""
+    success, original_details = original_outcome
+    file_num, total_files = details.pop("file_num"), details.pop("total_files")
+    original = details["duplicate_of"]
+    if not success:
+        message = f"Duplicate of {original}, which failed: {original_details.get('error')}"
+        error = handle_file_error(file, args, message, file_num, total_files)
+        return error[0], error[1], dict(details, **error[2])
+    try:
+        filename = materialize(file, args.output_dir, original_details["output_file"], args.output_mode)
+    except Exception as e:
+        error = handle_file_error(file, args, f"Error renaming file: {e}", file_num, total_files)
+        return error[0], error[1], dict(details, **error[2])
+    details.update(output_file=filename, parsed_info=original_details["parsed_info"])
+    return True, f"Done {file_num}/{total_files} as a duplicate of {os.path.basename(original)} ✅", details
+
+def run_two_stage(paths, args, references, caches, total_files="?"):
+    """
+    --extract_workers: extract resumes on a process pool (CPU-bound) and parse/match them
+    on --workers threads (waiting on OpenAI). Extracted texts wait in a queue of at most
+    --queue_size entries; while it is full no more extractions are scheduled, so memory
+    stays bounded when OpenAI is the bottleneck. Threads take up to --parse_batch_size
+    texts at a time. Yields (file, success, result message, details) in completion order.
+    """
+    queue_size = args.queue_size or 2 * args.workers * args.parse_batch_size
+    extract_pool = ExtractPool(args.extract_workers, text_cache=caches.text, log_level=args.log_level,
+                               log_file=args.log_file, log_file_level=args.log_file_level)
+    llm_pool = ThreadPoolExecutor(max_workers=args.workers)
+    extracting = {}  # future -> (file_num, file)
+    finishing = {}   # future -> [(file_num, file, text)]
+    ready = deque()  # extracted, waiting for an OpenAI thread
+    file_metrics = {}
+    started = {}
+    exhausted = False
+
+    def done(file_num, file, success, result, details):
+        file_metrics[file_num].stages["total"] = time.perf_counter() - started.pop(file_num)
+        return file, success, result, attach_metrics(details, file_metrics.pop(file_num))
+
+    try:
+        while True:
+            while (not exhausted and len(extracting) < 2 * args.extract_workers
+                   and len(ready) + len(extracting) < queue_size):
+                item = next(paths, None)
+                if item is None:
+                    exhausted = True
+                    break
+                file_num, file = item
+                logger.debug("Queueing file %s/%s for extraction: %s", file_num, total_files, file)
+                file_metrics[file_num] = FileMetrics(file)
+                started[file_num] = time.perf_counter()
+                digest = None
+                if duplicate_index:
+                    with log_context(file_num, file):
+                        try:
+                            digest = file_digest(file)
+                        except OSError as e:
+                            yield done(file_num, file, *handle_file_error(file, args, f"Error reading file: {e}",
+                                                                          file_num, total_files))
+                            continue
+                        original = duplicate_index.claim_file(file, digest)
+                        if original:
+                            yield done(file_num, file, *defer_duplicate(file, original, 1.0, file_num, total_files))
+                            continue
+                extracting[extract_pool.submit(file, digest, sign=bool(duplicate_index))] = item
+
+            # Wait for a full parsing batch unless nothing else is being extracted
+            while ready and len(finishing) < args.workers and (len(ready) >= args.parse_batch_size or not extracting):
+                batch = [ready.popleft() for _ in range(min(args.parse_batch_size, len(ready)))]
+                future = llm_pool.submit(finish_batch, batch, args, references, caches, total_files, file_metrics)
+                finishing[future] = batch
+
+            if not extracting and not finishing:
+                break
+            completed, _ = wait(list(extracting) + list(finishing), return_when=FIRST_COMPLETED)
+            for future in completed:
+                if future in extracting:
+                    file_num, file = extracting.pop(future)
+                    try:
+                        text_content, error, stages, counters, signature = future.result()
+                    except Exception as e:
+                        text_content, error, stages, counters, signature = None, str(e), {}, {}, None
+                    for name, seconds in stages.items():
+                        file_metrics[file_num].stages[name] += seconds
+                    for name, value in counters.items():
+                        file_metrics[file_num].counters[name] += value
+                    if error or not text_content.strip():
+                        message = f"Error extracting text: {error}" if error else "No text extracted from the resume."
+                        with log_context(file_num, file):
+                            yield done(file_num, file, *handle_file_error(file, args, message, file_num, total_files))
+                    else:
+                        if duplicate_index:
+                            duplicate_index.add_signature(file, signature)
+                        ready.append((file_num, file, text_content))
+                else:
+                    batch = finishing.pop(future)
+                    for (file_num, file, _), result in zip(batch, future.result()):
+                        yield done(file_num, file, *result)
+    finally:
+        llm_pool.shutdown()
+        extract_pool.shutdown()
+
+def run_pipeline(files, args, references, caches, total_files="?"):
+    """
+    Process resume paths from the (possibly lazy) iterable `files` and yield
+    (file, success, result message, details) as each one finishes.
+    Only a bounded number of files is pulled from `files` ahead of the workers.
+    """
+    paths = enumerate(files, 1)
+
+    if args.extract_workers > 0:
+        yield from run_two_stage(paths, args, references, caches, total_files)
+    elif args.parse_batch_size > 1:
+        # Several resumes share one parsing request; --workers resumes are extracted/finished at once
+        executor = ThreadPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+        chunk_size = args.parse_batch_size * args.workers
+        try:
+            while True:
+                batch = list(islice(paths, chunk_size))
+                if not batch:
+                    break
+                results = process_batch(batch, args, references, caches, total_files, executor)
+                for (_, file), result in zip(batch, results):
+                    yield (file,) + result
+        finally:
+            if executor:
+                executor.shutdown()
+    elif args.workers > 1:
+        # Extraction and OpenAI calls are dominated by waiting, so threads are enough here.
+        # Results are collected in completion order; summary updates go through summary_lock.
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            in_flight = {}
+            for file_num, file in paths:
+                in_flight[executor.submit(process_file, file, args, references, caches, file_num, total_files)] = file
+                if len(in_flight) >= args.workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield (in_flight.pop(future),) + future.result()
+            for future in as_completed(in_flight):
+                yield (in_flight[future],) + future.result()
+    else:
+        for file_num, file in paths:
+            yield (file,) + process_file(file, args, references, caches, file_num, total_files)
+
+def run_watch(args, references, caches, report, skip=None):
+    """
+    --watch: keep a warm worker pool (reference indexes, caches and the OpenAI client are
+    already loaded) and process resumes as soon as they finish landing in source_dir.
+    Runs until interrupted with Ctrl+C, then lets in-progress resumes finish.
+    """
+    logger.info("Watching %s for new resumes every %ss (Ctrl+C to stop)...", args.source_dir, args.watch_interval)
+    file_num = 0
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+
+    def process_one(file, file_num):
+        return [process_file(file, args, references, caches, file_num, "?")]
+
+    def report_batch(future, batch):
+        # An exception escaping process_file/process_batch (e.g. the resume was removed
+        # before it could be copied) still has to be journaled and counted as a failure
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.exception("Error processing %s", ", ".join(file for _, file in batch))
+            message = f"Error processing the resume: {e}"
+            results = [(False, f"Error {file_num}/? encountered an issue: {message} ❌", {"error": message})
+                       for file_num, _ in batch]
+        for (_, file), result in zip(batch, results):
+            report(file, *result)
+
+    try:
+        for ready in watch_resume_files(args.source_dir, recursive=args.recursive, exclude_dirs=[args.output_dir],
+                                        interval=args.watch_interval, settle_seconds=args.watch_settle, skip=skip):
+            if args.parse_batch_size > 1:
+                for start in range(0, len(ready), args.parse_batch_size):
+                    batch = [(file_num + i, file) for i, file in enumerate(ready[start:start + args.parse_batch_size], 1)]
+                    file_num += len(batch)
+                    future = executor.submit(process_batch, batch, args, references, caches, "?")
+                    future.add_done_callback(lambda f, batch=batch: report_batch(f, batch))
+            else:
+                for file in ready:
+                    file_num += 1
+                    future = executor.submit(process_one, file, file_num)
+                    future.add_done_callback(lambda f, batch=[(file_num, file)]: report_batch(f, batch))
+    except KeyboardInterrupt:
+        logger.info("Stopping watch mode; finishing resumes already in progress...")
+    finally:
+        executor.shutdown(wait=True)
+
+class OutcomeReporter:
+    """Prints, journals, records and counts per-file outcomes. Safe to call from worker threads."""
+
+    def __init__(self, journal, results_sink=None):
+        self.journal = journal
+        self.results_sink = results_sink
+        self.success_count = 0
+        self.error_count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, file, success, result, details):
+        with self._lock:
+            logger.log(logging.INFO if success else logging.WARNING, "%s", result)
+            self.journal.record(file, success, result, details)
+            if self.results_sink:
+                self.results_sink.write(build_record(file, success, result, details))
+
+            # Increment counters based on outcome
+            if success:
+                self.success_count += 1
+            else:
+                self.error_count += 1
+
 def print_summary():
     summary_text = (
         "\n[SUMMARY]\n"
@@ -202,7 +518,10 @@ def print_summary():
     return summary_text
 
 def main():
+    global duplicate_index
     args = parse_args()
+    setup_logging(args.log_level, log_file=args.log_file, log_file_level=args.log_file_level)
+    logger.debug("Arguments: %s", args)
 
     # Check if args are valid
     if not os.path.exists(args.source_dir):
@@ -215,46 +534,134 @@ def main():
         print(f"Error: Target list file {args.target_list} does not exist.")
         return
 
+    if args.workers < 1:
+        print(f"Error: --workers must be at least 1 (got {args.workers}).")
+        return
+    if args.parse_batch_size < 1:
+        print(f"Error: --parse_batch_size must be at least 1 (got {args.parse_batch_size}).")
+        return
+    if not 0 <= args.near_duplicate_threshold <= 1:
+        print(f"Error: --near_duplicate_threshold must be between 0 and 1 (got {args.near_duplicate_threshold}).")
+        return
+    if args.extract_workers < 0:
+        print(f"Error: --extract_workers cannot be negative (got {args.extract_workers}).")
+        return
+    if args.alias_max_entries < 1:
+        print(f"Error: --alias_max_entries must be at least 1 (got {args.alias_max_entries}).")
+        return
+
     # Check QS50 list path
     if args.qs50_list and not os.path.exists(args.qs50_list):
         print(f"Error: QS50 list file {args.qs50_list} does not exist.")
         return
 
-    # Load QS50 universities from file
-    qs50_list = []
-    if args.qs50_list:
-        with open(args.qs50_list, 'r', encoding='utf-8') as f:
-            qs50_list = [line.strip() for line in f if line.strip()]
-            
-    # Get all files with the following extensions: PDF, DOCX, DOC
-    files = [file for file in os.listdir(args.source_dir) if file.endswith((".pdf", ".docx", ".doc"))]
-    total_files = len(files)
-    successfully_processed_count = 0  # Files renamed and created successfully
-    error_files_count = 0  # Files that encountered errors and renamed with "ERROR - name"
-
-    # Print initial message with number of resumes
-    print(f"\nHello, Amanda! I'm AlexAI. I will now process {total_files} resumes for you.")
-    print()
+    # Load target schools, award lists and QS50 once; every resume queries these indexes
+    try:
+        references = load_reference_data(args)
+    except Exception as e:
+        print(f"Error: Could not load reference lists: {e}")
+        return
+    logger.debug("Loaded %s target schools, %s + %s awards, %s QS50 schools",
+                 len(references.schools), len(references.awards), len(references.awards2), len(references.qs50))
+
+    configure_client(base_url=args.openai_base_url, max_in_flight=args.max_in_flight,
+                     requests_per_minute=args.rpm, tokens_per_minute=args.tpm, max_retries=args.max_retries)
+    configure_ocr(dpi=args.ocr_dpi, max_pages=args.ocr_max_pages, workers=args.ocr_workers)
+    configure_extraction(max_pages=args.extract_max_pages, max_chars=args.extract_max_chars,
+                         doc_timeout=args.doc_timeout)
+    configure_prompt(trim=not args.no_trim_prompt, max_chars=args.prompt_max_chars)
+    if args.fast_path:
+        configure_fast_path(references, min_confidence=args.fast_path_min_confidence)
+    caches = open_caches(args, references)
+    for cache in caches.disk_caches():
+        cache.evict()
+
+    # Per-file outcomes are appended to a journal in output_dir; --resume picks up from it
+    journal_records = {}
+    if args.resume:
+        journal_records = load_journal(os.path.join(args.output_dir, JOURNAL_FILENAME))
+    journal = Journal(args.output_dir, args.source_dir, append=args.resume)
+    restored = set()
+
+    def skip(file):
+        """True for files finished in the previous run; their results go back into the summary once."""
+        if not journal.is_done(journal_records, file):
+            return False
+        key = journal.key(file)
+        if key not in restored:
+            restored.add(key)
+            record = journal_records[key]
+            if record.get("parsed_info") and not record.get("duplicate_of"):
+                update_summary(record["parsed_info"])
+        return True
+    try:
+        results_sink = open_results_sink(args)
+    except Exception as e:
+        print(f"Error: Could not open the results file: {e}")
+        journal.close()
+        return
+    outcomes = OutcomeReporter(journal, results_sink)
+    report = outcomes
+    if not args.no_dedup:
+        duplicate_index = DuplicateIndex(threshold=args.near_duplicate_threshold)
+        report = DuplicateResolver(outcomes, lambda file, outcome, details: finish_duplicate(file, outcome, args, details))
+
+    # Print initial message
+    print(f"\nHello, Amanda! I'm AlexAI. I will now process the resumes in {args.source_dir} for you.\n")
 
     # Process each file
-    for file_num, file in enumerate(files, 1):
-        file_path = os.path.join(args.source_dir, file)
-        success, result = process_file(file_path, args, qs50_list, file_num, total_files)
-        print(result)
-        
-        # Increment counters based on outcome
-        if success:
-            successfully_processed_count += 1
+    try:
+        if args.watch:
+            run_watch(args, references, caches, report, skip=skip if args.resume else None)
         else:
-            error_files_count += 1
+            # Stream all files with the following extensions: PDF, DOCX, DOC
+            files = iter_resume_files(args.source_dir, recursive=args.recursive, exclude_dirs=[args.output_dir])
+            if args.resume:
+                files = (file for file in files if not skip(file))
+            for outcome in run_pipeline(files, args, references, caches):
+                report(*outcome)
+    finally:
+        if isinstance(report, DuplicateResolver):
+            report.close()
+        journal.close()
+        if results_sink:
+            results_sink.close()
+    if restored:
+        print(f"\n{len(restored)} resume(s) were already done in a previous run and were skipped.")
+    successfully_processed_count = len(restored) + outcomes.success_count  # Files renamed and created successfully
+    error_files_count = outcomes.error_count  # Files that encountered errors and renamed with "ERROR - name"
 
     # Final message after all files are processed
     print(f"\nAlex is the best ❤️\n")
     print(f"He renamed and created {successfully_processed_count} resumes for you 🥳")
     print(f"{error_files_count} resume(s) were renamed with 'ERROR' due to issues 😡\n")
 
+    for cache in caches.disk_caches():
+        cache.evict()
+    caches.save()
+    client = get_client()
+    logger.info("OpenAI: %s request(s) (%s failed), %s retr(ies), %s prompt / %s completion tokens",
+                client.requests, client.failures, client.retries, client.prompt_tokens, client.completion_tokens)
+    if caches.parse:
+        logger.info("Parse cache: %s hit(s), %s miss(es); alias hits: %s school(s), %s award(s)",
+                    caches.parse.hits, caches.parse.misses, caches.schools.hits, caches.awards.hits)
+
     # Print summary after all resumes are processed and write to text file
     summary_text = print_summary()
+    if duplicate_index:
+        duplicate_text = duplicate_index.summary_text()
+        if duplicate_text:
+            print(duplicate_text)
+            summary_text += "\n" + duplicate_text
+    stage_text = collector.summary_text()
+    print(stage_text)
+    summary_text += "\n" + stage_text
+    if args.metrics_file:
+        try:
+            collector.export(args.metrics_file, args.metrics_format)
+            logger.debug("Wrote %s metrics to %s", args.metrics_format, args.metrics_file)
+        except OSError as e:
+            logger.error("Could not write metrics file %s: %s", args.metrics_file, e)
 
     # Write summary to a text file in the output directory
     summary_file_path = os.path.join(args.output_dir, "summary.txt")
@@ -262,4 +669,5 @@ def main():
         summary_file.write(summary_text)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # OCR worker processes in the PyInstaller build
     main()
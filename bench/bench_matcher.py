@@ -0,0 +1,126 @@
+# Parity check + benchmark for matcher.ReferenceIndex
+#
+# Builds synthetic school/award reference lists of increasing size, checks that the
+# index returns the same >= threshold decisions as the plain SequenceMatcher scan
+# used before, and reports lookup latency and how many candidates survived pruning.
+#
+# Usage:
+#   python bench/bench_matcher.py [--sizes 1000 10000 100000] [--queries 200] [--threshold 0.9]
+# Exits with status 1 if any parity mismatch is found.
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from matcher import ReferenceIndex  # noqa: E402
+
+CJK_CHARS = "北京清华复旦浙江南开天津武汉华中科技西安交通上海同济东南四川重庆山东吉林哈尔滨工业中山厦门兰州电子航空航天理工师范农业医科财经政法外国语传媒矿业石油地质林海洋民族"
+EN_WORDS = ["North", "South", "East", "West", "Central", "State", "Technical", "National", "Pacific",
+            "Atlantic", "Lake", "River", "Mountain", "Valley", "Royal", "Imperial", "Metropolitan",
+            "Capital", "Coastal", "Highland", "Institute", "College", "Polytechnic", "Science"]
+
+
+def synthetic_entry(rng):
+    if rng.random() < 0.6:
+        name = "".join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 6)))
+        return name + rng.choice(["大学", "学院", "理工大学", "师范大学", "科技大学"])
+    words = rng.sample(EN_WORDS, rng.randint(1, 3))
+    return "University of " + " ".join(words) if rng.random() < 0.5 else " ".join(words) + " University"
+
+
+def mutate(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 2)):
+        op = rng.random()
+        if op < 0.35 and chars:
+            del chars[rng.randrange(len(chars))]
+        elif op < 0.7:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(CJK_CHARS + "aeiou "))
+        elif chars:
+            chars[rng.randrange(len(chars))] = rng.choice(CJK_CHARS + "aeiou")
+    return "".join(chars)
+
+
+def linear_best_match(query, entries, threshold, lowercase):
+    """The pre-index behaviour: score every entry, keep the first strictly-best one."""
+    norm = (lambda s: s.strip().lower()) if lowercase else (lambda s: s.strip())
+    key = norm(query)
+    best_entry, best_ratio = None, 0.0
+    for entry in entries:
+        ratio = SequenceMatcher(None, key, norm(entry)).ratio()
+        if ratio > best_ratio:
+            best_entry, best_ratio = entry, ratio
+    if best_ratio < threshold:
+        return None, 0.0
+    return best_entry, best_ratio
+
+
+def run_size(size, num_queries, threshold, lowercase, rng):
+    seen = set()
+    entries = []
+    while len(entries) < size:
+        entry = synthetic_entry(rng)
+        if entry not in seen:
+            seen.add(entry)
+            entries.append(entry)
+
+    start = time.perf_counter()
+    index = ReferenceIndex(entries, lowercase=lowercase)
+    build_s = time.perf_counter() - start
+
+    queries = [mutate(rng, rng.choice(entries)) if rng.random() < 0.7 else synthetic_entry(rng)
+               for _ in range(num_queries)]
+
+    start = time.perf_counter()
+    results = [index.best_match(q, threshold) for q in queries]
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    candidates = [len(index._candidates(index.normalize(q), Counter(index.normalize(q)), threshold)) for q in queries]
+
+    # The linear scan gets slow at 100k entries, so parity is checked on a subset there
+    parity_queries = queries[:max(20, num_queries * 1000 // size)]
+    mismatches = 0
+    start = time.perf_counter()
+    for q, got in zip(parity_queries, results):
+        expected = linear_best_match(q, entries, threshold, lowercase)
+        if got != expected:
+            mismatches += 1
+            print(f"  MISMATCH query={q!r} index={got} linear={expected}")
+    linear_ms = (time.perf_counter() - start) * 1000 / len(parity_queries)
+
+    hits = sum(1 for entry, _ in results if entry is not None)
+    print(f"{size:>8} entries | build {build_s * 1000:8.1f} ms | index {index_ms:8.3f} ms/lookup | "
+          f"linear {linear_ms:9.3f} ms/lookup | speedup {linear_ms / index_ms if index_ms else float('inf'):7.1f}x | "
+          f"avg candidates {sum(candidates) / len(candidates):7.1f} | hits {hits}/{len(queries)} | "
+          f"parity {len(parity_queries) - mismatches}/{len(parity_queries)}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ReferenceIndex parity check and benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--lowercase', action='store_true', help='Normalize like the award lists do.')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mismatches = 0
+    for size in args.sizes:
+        mismatches += run_size(size, args.queries, args.threshold, args.lowercase, rng)
+
+    if mismatches:
+        print(f"\n{mismatches} parity mismatch(es) found ❌")
+        sys.exit(1)
+    print("\nIndex decisions match the SequenceMatcher scan ✅")
+
+
+if __name__ == "__main__":
+    main()
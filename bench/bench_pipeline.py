@@ -0,0 +1,220 @@
+# Offline end-to-end benchmark for ResumeCLT
+#
+# Generates a synthetic corpus of resumes (text PDFs, scanned PDFs and DOCX files, in
+# English and Chinese, 1 to --max_pages pages), starts bench/stub_openai.py to replay
+# recorded OpenAI completions, then runs ResumeCLT.py over the corpus once per --workers
+# setting. Reports files/sec, per-stage latency (from ResumeCLT's --metrics_file) and the
+# peak RSS of the run. No network access or API key is needed.
+#
+# Usage:
+#   python bench/bench_pipeline.py [--files 60] [--workers 1 4 8] [--latency_ms 300]
+#                                  [--scanned 0.2] [--docx 0.3] [--zh 0.5] [--max_pages 3]
+#                                  [--corpus_dir DIR] [--json_out FILE] [-- extra ResumeCLT args]
+# Scanned PDFs need tesseract and poppler, like the tool itself.
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from stub_openai import DEFAULT_FIXTURES, StubOpenAIServer, load_fixtures  # noqa: E402
+
+REPORTED_STAGES = ("total", "extract", "ocr", "parse", "school_match", "award_match", "output")
+LINES_PER_PAGE = 45
+FONT_SIZES = (9, 8, 7, 6)  # tried in order until a page's lines fit
+
+EN_NAMES = ["Emily Carter", "Rahul Mehta", "Lucas Moreau", "Sofia Rossi", "Daniel Kim", "Hannah Schmidt"]
+ZH_NAMES = ["张伟", "李娜", "王磊", "刘洋", "陈静", "杨帆"]
+EN_SCHOOLS = ["University of Toronto", "Carnegie Mellon University", "IIT Bombay", "ETH Zurich", "University of Washington"]
+EN_FILLER = ("Designed and shipped a distributed data pipeline processing several terabytes per day; "
+             "mentored junior engineers and led code reviews across three teams.")
+ZH_FILLER = "负责分布式数据处理平台的设计与实现，日处理数据量达数TB；指导新人并主导跨团队代码评审。"
+
+
+def read_list(name):
+    with open(os.path.join(REPO_DIR, name), 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def resume_lines(rng, zh, pages, schools, awards):
+    """Plain-text lines of one synthetic resume, long enough to fill `pages` pages."""
+    if zh:
+        lines = [rng.choice(ZH_NAMES), "教育背景",
+                 f"博士  {rng.choice(schools)}  2021-2026", f"硕士  {rng.choice(schools)}  2018-2021",
+                 f"本科  {rng.choice(schools)}  2014-2018", "获奖情况"]
+    else:
+        lines = [rng.choice(EN_NAMES), "Education",
+                 f"M.S. {rng.choice(EN_SCHOOLS)} 2023-2025", f"B.S. {rng.choice(EN_SCHOOLS + schools)} 2019-2023",
+                 "Awards"]
+    lines += [f"- {award}" for award in rng.sample(awards, 3)]
+    lines.append("工作经历" if zh else "Experience")
+    filler = ZH_FILLER if zh else EN_FILLER
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(filler)
+    return lines
+
+
+def _fill_page(page, lines, fontname):
+    """
+    Write as many of `lines` as fit on `page` and return how many. insert_textbox writes
+    nothing (and returns a negative number) when the text overflows, so the font is
+    shrunk first and then fewer lines are put on the page.
+    """
+    count = len(lines)
+    while True:
+        for fontsize in FONT_SIZES:
+            if page.insert_textbox(page.rect + (50, 50, -50, -50), "\n".join(lines[:count]),
+                                   fontsize=fontsize, fontname=fontname) >= 0:
+                return count
+        if count == 1:
+            raise ValueError(f"line does not fit on a page: {lines[0][:60]!r}")
+        count = max(1, count * 3 // 4)
+
+
+def write_pdf(path, lines, zh, scanned):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    start = 0
+    while start < len(lines):
+        page = doc.new_page()
+        start += _fill_page(page, lines[start:start + LINES_PER_PAGE], "china-s" if zh else "helv")
+        assert page.get_text().strip(), "generated PDF page has no text layer"
+    if scanned:
+        # Rasterize every page so the PDF has no text layer, like a scanner would produce
+        image_doc = fitz.open()
+        for page in doc:
+            pixmap = page.get_pixmap(dpi=150)
+            image_doc.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pixmap)
+        doc.close()
+        doc = image_doc
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(path, lines):
+    from docx import Document
+
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def generate_corpus(directory, count, rng, scanned=0.2, docx=0.3, zh=0.5, max_pages=3):
+    """Write `count` synthetic resumes to `directory`; returns {kind: number of files}."""
+    schools = read_list("test_school_list.txt")
+    awards = read_list("award_list.txt") + read_list("award_list2.txt")
+    kinds = {}
+    for i in range(count):
+        is_zh = rng.random() < zh
+        pages = rng.randint(1, max_pages)
+        lines = resume_lines(rng, is_zh, pages, schools, awards)
+        roll = rng.random()
+        if roll < docx:
+            kind = "docx"
+            write_docx(os.path.join(directory, f"resume_{i:04d}.docx"), lines)
+        else:
+            kind = "scanned_pdf" if roll < docx + scanned else "pdf"
+            write_pdf(os.path.join(directory, f"resume_{i:04d}.pdf"), lines, is_zh, kind == "scanned_pdf")
+        kinds[kind] = kinds.get(kind, 0) + 1
+    return kinds
+
+
+def run_once(corpus_dir, workers, base_url, extra_args):
+    """Run ResumeCLT.py once; returns (wall seconds, peak RSS in MB, metrics dict, exit status)."""
+    output_dir = tempfile.mkdtemp(prefix="resumeclt_bench_out_")
+    metrics_file = os.path.join(output_dir, "metrics.json")
+    command = [sys.executable, os.path.join(REPO_DIR, "ResumeCLT.py"),
+               "--source_dir", corpus_dir, "--output_dir", output_dir,
+               "--workers", str(workers), "--openai_base_url", base_url,
+               "--no-cache", "--results_format", "none", "--log_level", "error",
+               "--metrics_file", metrics_file] + extra_args
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "stub"))
+    try:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL)
+        # wait4 reports the child's peak RSS, including the OCR processes it reaped
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - start
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        try:
+            with open(metrics_file, 'r', encoding='utf-8') as f:
+                metrics = json.load(f)
+        except (OSError, ValueError):
+            metrics = {}
+        return elapsed, peak_rss_mb, metrics, process.returncode
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline ResumeCLT throughput benchmark with a stub OpenAI server')
+    parser.add_argument('--files', type=int, default=60, help='Number of synthetic resumes to generate.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--latency_ms', type=float, default=300, help='Simulated OpenAI latency per request.')
+    parser.add_argument('--scanned', type=float, default=0.2, help='Fraction of scanned (image-only) PDFs.')
+    parser.add_argument('--docx', type=float, default=0.3, help='Fraction of DOCX resumes.')
+    parser.add_argument('--zh', type=float, default=0.5, help='Fraction of Chinese resumes.')
+    parser.add_argument('--max_pages', type=int, default=3)
+    parser.add_argument('--corpus_dir', default=None, help='Reuse (or keep) the corpus in this directory.')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='Recorded completions to replay.')
+    parser.add_argument('--json_out', default=None, help='Also write the results as JSON (e.g. to compare runs).')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('extra', nargs=argparse.REMAINDER, help='Extra ResumeCLT.py arguments after "--".')
+    args = parser.parse_args()
+    extra_args = [a for a in args.extra if a != "--"]
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="resumeclt_bench_corpus_")
+    os.makedirs(corpus_dir, exist_ok=True)
+    if not any(name.endswith((".pdf", ".docx", ".doc")) for name in os.listdir(corpus_dir)):
+        start = time.perf_counter()
+        kinds = generate_corpus(corpus_dir, args.files, random.Random(args.seed), scanned=args.scanned,
+                                docx=args.docx, zh=args.zh, max_pages=args.max_pages)
+        print(f"Generated {args.files} resumes in {corpus_dir} ({time.perf_counter() - start:.1f}s): {kinds}")
+    file_count = sum(1 for name in os.listdir(corpus_dir) if name.endswith((".pdf", ".docx", ".doc")))
+
+    server = StubOpenAIServer(load_fixtures(args.fixtures), latency=args.latency_ms / 1000).start()
+    results = []
+    try:
+        header = f"{'workers':>7} {'files/s':>8} {'wall s':>8} {'peak RSS MB':>12}"
+        header += "".join(f" {name + ' p50/p95':>22}" for name in REPORTED_STAGES)
+        print(header)
+        for workers in args.workers:
+            elapsed, peak_rss_mb, metrics, status = run_once(corpus_dir, workers, server.base_url, extra_args)
+            stages = metrics.get("stages", {})
+            row = f"{workers:>7} {file_count / elapsed:>8.2f} {elapsed:>8.1f} {peak_rss_mb:>12.1f}"
+            for name in REPORTED_STAGES:
+                entry = stages.get(name)
+                cell = f"{entry['p50']:.3f}/{entry['p95']:.3f}" if entry else "-"
+                row += f" {cell:>22}"
+            print(row + ("" if status == 0 else f"  (exit status {status})"))
+            results.append({"workers": workers, "files": file_count, "wall_seconds": round(elapsed, 3),
+                            "files_per_second": round(file_count / elapsed, 3), "peak_rss_mb": round(peak_rss_mb, 1),
+                            "stages": stages, "totals": metrics.get("totals", {}), "exit_status": status})
+    finally:
+        server.stop()
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    print(f"\nStub OpenAI requests served: {server.requests}")
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({"latency_ms": args.latency_ms, "runs": results}, f, indent=2)
+    if any(r["exit_status"] != 0 for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
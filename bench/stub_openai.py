@@ -0,0 +1,178 @@
+# Local stand-in for the OpenAI chat completions API, for offline benchmarks
+#
+# Answers every POST .../chat/completions with a recorded completion from a fixtures file
+# (default: bench/fixtures/completions.json), so ResumeCLT can run end to end without the
+# network or an API key:
+#   - resume parsing (single and batched) -> one of the recorded "parse" answers, picked by
+#     a hash of the resume text so the same resume always gets the same answer
+#   - school matching                    -> the recorded "school_match" answer
+#   - award matching (full and partial)  -> "award_match" entries for the awards asked about
+#
+# Usage:
+#   python bench/stub_openai.py [--port 8765] [--latency_ms 300] [--fixtures FILE]
+#   ResumeCLT.py ... --openai_base_url http://127.0.0.1:8765/v1
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "completions.json")
+
+BATCH_HEADER = re.compile(r"^=== RESUME (.+?) ===$", re.MULTILINE)
+
+
+def load_fixtures(path=DEFAULT_FIXTURES):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _pick(answers, text):
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return answers[int.from_bytes(digest[:4], 'big') % len(answers)]
+
+
+def _section(prompt, start, end):
+    """Lines of `prompt` between the `start` marker and the next `end` marker."""
+    after = prompt.split(start, 1)[1] if start in prompt else ""
+    return [line for line in after.split(end, 1)[0].splitlines() if line.strip()]
+
+
+def answer(fixtures, messages):
+    """The recorded answer (completion content) for one chat request, and its kind."""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+
+    if system and "BATCH MODE" in system:
+        parts = BATCH_HEADER.split(user)[1:]
+        items = [dict(_pick(fixtures["parse"], text), resume_id=resume_id)
+                 for resume_id, text in zip(parts[::2], parts[1::2])]
+        return json.dumps(items, ensure_ascii=False), "parse_batch"
+    if system:
+        return json.dumps(_pick(fixtures["parse"], user), ensure_ascii=False), "parse"
+    if "school name matcher" in user:
+        return json.dumps(fixtures["school_match"]), "school_match"
+    if "award classification assistant" in user:
+        if "Resume Awards:\n" in user:  # match_awards_with_openai
+            awards = _section(user, "Resume Awards:\n", "\n\nList 1")
+        else:  # match_awards_with_openai_partially
+            awards = _section(user, "We only have these unmatched awards:\n", "\n\nList1")
+        known = fixtures.get("award_match", {})
+        items = []
+        for award in awards:
+            match = known.get(award.strip().lower(), {"matched_award": "None", "list": "No Awards", "confidence": "Low"})
+            items.append(dict(match, resume_award=award))
+        return json.dumps(items, ensure_ascii=False), "award_match"
+    return "{}", "unknown"
+
+
+class StubOpenAIServer:
+    """
+    Threaded HTTP server replaying `fixtures`; each answer is delayed by `latency` seconds.
+    The first requests are answered with the HTTP error statuses in `errors` (e.g. 429,
+    500), one per request, to exercise the client's retries.
+    """
+
+    def __init__(self, fixtures=None, host="127.0.0.1", port=0, latency=0.0, errors=()):
+        self.fixtures = fixtures or load_fixtures()
+        self.latency = latency
+        self.errors = list(errors)
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def _next_error(self):
+        with self._lock:
+            return self.errors.pop(0) if self.errors else None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status = stub._next_error()
+                if status:
+                    stub._count("error")
+                    self._send(status, {"error": {"message": f"stub error {status}", "type": "stub_error"}})
+                    return
+                messages = body.get("messages", [])
+                content, kind = answer(stub.fixtures, messages)
+                stub._count(kind)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 3
+                completion_tokens = len(content) // 3
+                self._send(200, {
+                    "id": f"chatcmpl-stub-{kind}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+            def _send(self, status, body):
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output readable
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible server replaying recorded completions')
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency_ms', type=float, default=0, help='Simulated API latency per request.')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(load_fixtures(args.fixtures), host=args.host, port=args.port,
+                              latency=args.latency_ms / 1000)
+    print(f"Serving recorded completions at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Requests served: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
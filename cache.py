@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Share of --cache_max_mb given to the extracted-text cache; the parse cache gets the rest.
+# Texts are several KB per resume, parse results a few hundred bytes.
+TEXT_CACHE_SHARE = 0.75
+
+
+def make_key(*parts):
+    """Content-addressed cache key: sha256 over the given string parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode('utf-8') if isinstance(part, str) else part
+        # Length prefix keeps ("ab", "c") and ("a", "bc") apart
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """sha256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    JSON values stored one file per key under `directory`, sharded by the first two
+    hex characters of the key. Writes go through a temp file + os.replace so
+    concurrent workers never see partial entries.
+
+    Eviction:
+      - entries older than `max_age_seconds` (by mtime) are treated as misses and removed
+      - `evict()` trims the cache to `max_bytes`, dropping least recently used entries
+        first (hits refresh the mtime).
+    With `refresh=True`, every lookup misses and new values overwrite the old ones.
+    """
+
+    def __init__(self, directory, max_bytes=None, max_age_seconds=None, refresh=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _expired(self, mtime, now=None):
+        if not self.max_age_seconds:
+            return False
+        return (now or time.time()) - mtime > self.max_age_seconds
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss."""
+        if self.refresh:
+            self._count(False)
+            return None
+        path = self._path(key)
+        try:
+            if self._expired(os.path.getmtime(path)):
+                os.remove(path)
+                self._count(False)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+        self._count(True)
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write cache entry %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """Remove expired entries, then the least recently used ones until under max_bytes."""
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(".tmp") or self._expired(stat.st_mtime, now):
+                    if name.endswith(".tmp") and now - stat.st_mtime < 3600:
+                        continue  # possibly still being written by another process
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if self.max_bytes and total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                    total -= size
+                except OSError:
+                    pass
+        return removed
+
+
+class AliasStore:
+    """
+    Persistent LRU map from a school/award string the local matcher could not resolve
+    to the answer OpenAI gave for it (including "no match"), so later resumes with the
+    same spelling resolve locally.
+
+    The store is tied to a `fingerprint` of the reference list(s) it was built against;
+    if the lists change, the saved entries are discarded on load. At most `max_entries`
+    are kept, evicting the least recently used.
+    """
+
+    def __init__(self, path, fingerprint, max_entries=10000, refresh=False, autosave_every=25):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.autosave_every = autosave_every
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if not refresh:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable alias store %s: %s", self.path, e)
+            return
+        if not isinstance(data, dict) or not isinstance(data.get("entries", []), list):
+            logger.warning("Ignoring malformed alias store %s", self.path)
+            return
+        if data.get("fingerprint") != self.fingerprint:
+            logger.debug("Reference list changed; discarding cached aliases in %s", self.path)
+            return
+        entries = data.get("entries", [])
+        for entry in entries[max(0, len(entries) - self.max_entries):]:
+            if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str):
+                self._entries[entry[0]] = entry[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the stored answer for `key`, or None if it has not been resolved yet."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            autosave = self._unsaved >= self.autosave_every
+        if autosave:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            if not self._unsaved:
+                return
+            data = {"fingerprint": self.fingerprint, "entries": list(self._entries.items())}
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not save alias store %s: %s", self.path, e)
+
+
+class Caches:
+    """The caches used during a run. A disabled cache is None."""
+
+    def __init__(self, parse=None, text=None, schools=None, awards=None):
+        self.parse = parse
+        self.text = text
+        self.schools = schools
+        self.awards = awards
+
+    def disk_caches(self):
+        return [c for c in (self.parse, self.text) if c is not None]
+
+    def save(self):
+        for store in (self.schools, self.awards):
+            if store is not None:
+                store.save()
+
+
+def open_caches(args, references):
+    """
+    Create the caches configured on the command line (--cache_dir, --no-cache, ...).
+    Alias stores are fingerprinted with the `references` they resolve against.
+    """
+    if args.no_cache:
+        return Caches()
+    # --cache_max_mb is the budget of both disk caches together
+    text_bytes = parse_bytes = None
+    if args.cache_max_mb:
+        max_bytes = int(args.cache_max_mb * 1024 * 1024)
+        text_bytes = int(max_bytes * TEXT_CACHE_SHARE)
+        parse_bytes = max_bytes - text_bytes
+    max_age = args.cache_max_age_days * 86400 if args.cache_max_age_days else None
+    return Caches(
+        parse=DiskCache(os.path.join(args.cache_dir, "parse"), max_bytes=parse_bytes,
+                        max_age_seconds=max_age, refresh=args.refresh_cache),
+        text=DiskCache(os.path.join(args.cache_dir, "text"), max_bytes=text_bytes,
+                       max_age_seconds=max_age, refresh=args.refresh_cache),
+        schools=AliasStore(os.path.join(args.cache_dir, "school_aliases.json"),
+                           references.schools.fingerprint,
+                           max_entries=args.alias_max_entries, refresh=args.refresh_cache),
+        awards=AliasStore(os.path.join(args.cache_dir, "award_aliases.json"),
+                          make_key(references.awards.fingerprint, references.awards2.fingerprint),
+                          max_entries=args.alias_max_entries, refresh=args.refresh_cache),
+    )
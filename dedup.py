@@ -0,0 +1,206 @@
+import re
+import threading
+import zlib
+
+# Near-duplicate detection: MinHash over character 5-grams of the normalized text
+# (lowercase, letters/digits/CJK only, so PDF vs DOCX layout differences vanish),
+# with LSH banding to find candidates without comparing against every resume.
+# The signature uses one-permutation hashing: each shingle is hashed once and lands in
+# one of NUM_PERM bins, which keep their minimum; empty bins borrow from the next
+# non-empty one (densification). That is one hash per shingle instead of NUM_PERM, so a
+# resume costs milliseconds of GIL time rather than a fifth of a second.
+SHINGLE_CHARS = 5
+NUM_PERM = 64
+BIN_BITS = 6  # NUM_PERM == 1 << BIN_BITS
+BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 similarity almost always share a band
+MAX_NORMALIZED_CHARS = 10000
+MIN_NORMALIZED_CHARS = 200  # shorter texts are too small to compare reliably
+DENSIFY_OFFSET = 1 << (32 - BIN_BITS)  # above any bin value, so borrowed values stay distinct
+
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM ints) of `text`, or None if it is too short."""
+    normalized = NON_WORD.sub("", text.lower())[:MAX_NORMALIZED_CHARS]
+    if len(normalized) < MIN_NORMALIZED_CHARS:
+        return None
+    bins = [None] * NUM_PERM
+    mask = NUM_PERM - 1
+    for i in range(len(normalized) - SHINGLE_CHARS + 1):
+        h = zlib.crc32(normalized[i:i + SHINGLE_CHARS].encode('utf-8'))
+        b, value = h & mask, h >> BIN_BITS
+        current = bins[b]
+        if current is None or value < current:
+            bins[b] = value
+    signature = []
+    for b, value in enumerate(bins):
+        distance = 0
+        while value is None:
+            distance += 1
+            value = bins[(b + distance) % NUM_PERM]
+        signature.append(value + distance * DENSIFY_OFFSET)
+    return tuple(signature)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(signature, other)) / NUM_PERM
+
+
+class DuplicateIndex:
+    """
+    Remembers every resume of the run, by file content hash and by MinHash of its text,
+    so repeats can reuse the first copy's result instead of being extracted and parsed
+    again. Each file is claimed once: claim_file before extraction (byte-identical
+    copies), claim_text after it (re-exports, re-saves, small edits). A claim returns the
+    original the file duplicates, or None if the file is an original itself. A file
+    claimed again with a new digest (replaced in watch mode) is forgotten first and then
+    claimed like a new one. Signatures computed elsewhere (e.g. in an extraction
+    process) can be handed in with add_signature so claim_text does not compute them
+    again.
+    Safe to use from several threads.
+    """
+
+    def __init__(self, threshold=0.9):
+        self.threshold = threshold  # 0 = exact duplicates only
+        self.duplicates = {}        # file -> (original, similarity)
+        self.exact = set()          # duplicates found by content hash
+        self._by_digest = {}
+        self._digests = {}          # file -> digest it was claimed with
+        self._bands = {}
+        self._signed = {}           # originals already in the bands -> their band keys
+        self._signatures = {}       # file -> signature from add_signature, until claimed
+        self._lock = threading.Lock()
+
+    def claim_file(self, file, digest):
+        """The file `file` is a byte-identical copy of, or None."""
+        with self._lock:
+            if self._digests.get(file, digest) != digest:
+                self._forget(file)
+            self._digests[file] = digest
+            original = self._by_digest.setdefault(digest, file)
+            if original == file:
+                return None
+            self.duplicates[file] = (original, 1.0)
+            self.exact.add(file)
+            return original
+
+    def _forget(self, file):
+        """Drop what is known about `file`'s earlier contents. Caller holds the lock."""
+        self.duplicates.pop(file, None)
+        self.exact.discard(file)
+        self._signatures.pop(file, None)
+        digest = self._digests.pop(file)
+        if self._by_digest.get(digest) == file:
+            del self._by_digest[digest]
+        for key in self._signed.pop(file, ()):
+            self._bands[key] = [entry for entry in self._bands[key] if entry[0] != file]
+            if not self._bands[key]:
+                del self._bands[key]
+
+    def add_signature(self, file, signature):
+        """Remember `file`'s minhash(text), computed by the caller, for its claim_text."""
+        with self._lock:
+            self._signatures[file] = signature
+
+    def claim_text(self, file, text):
+        """(original, similarity) if `file`'s text nearly duplicates an earlier resume, else None."""
+        with self._lock:
+            if file in self.duplicates:
+                return self.duplicates[file]
+            if file in self._signed:
+                return None
+            precomputed = file in self._signatures
+            signature = self._signatures.pop(file, None)
+        if not self.threshold:
+            return None
+        if not precomputed:
+            signature = minhash(text)
+        if signature is None:
+            return None
+        keys = [(band, signature[band::BANDS]) for band in range(BANDS)]
+        with self._lock:
+            best = None
+            for key in keys:
+                for original, original_signature in self._bands.get(key, ()):
+                    score = similarity(signature, original_signature)
+                    if score >= self.threshold and (best is None or score > best[1]):
+                        best = (original, score)
+            if best:
+                self.duplicates[file] = best
+                return best
+            self._signed[file] = keys
+            for key in keys:
+                self._bands.setdefault(key, []).append((file, signature))
+            return None
+
+    def clusters(self):
+        """{original: [(duplicate, similarity)]}, following chains back to the first copy."""
+        clusters = {}
+        with self._lock:
+            for file, (original, score) in self.duplicates.items():
+                while original in self.duplicates:
+                    original, parent_score = self.duplicates[original]
+                    score = min(score, parent_score)
+                clusters.setdefault(original, []).append((file, score))
+        return clusters
+
+    def summary_text(self):
+        clusters = self.clusters()
+        if not clusters:
+            return ""
+        count = sum(len(copies) for copies in clusters.values())
+        lines = [f"[DUPLICATES] {count} resume(s) reused the result of an earlier copy ({len(clusters)} cluster(s))"]
+        for original, copies in sorted(clusters.items()):
+            lines.append(f" {original}")
+            for file, score in sorted(copies):
+                lines.append(f"   = {file}" if file in self.exact else f"   ~ {file} ({score:.0%} similar)")
+        return "\n".join(lines) + "\n"
+
+
+class DuplicateResolver:
+    """
+    Wraps the outcome reporter: duplicates whose original has not finished yet are held
+    back, then finished with `finish(file, (success, original details), details)` and
+    reported right after the original. Originals never wait for duplicates, so workers
+    are not blocked. Duplicates still waiting when the run ends (their original raised
+    or was interrupted before reporting) are finished as failed by close().
+    Safe to call from worker threads.
+    """
+
+    def __init__(self, report, finish):
+        self.report = report
+        self.finish = finish
+        self.outcomes = {}  # file -> (success, details needed by its duplicates)
+        self.waiting = {}   # original -> [(file, details)]
+        self._lock = threading.Lock()
+
+    def __call__(self, file, success, result, details):
+        with self._lock:
+            self._resolve([(file, success, result, details)])
+
+    def _resolve(self, pending):
+        while pending:
+            file, success, result, details = pending.pop()
+            if success is None:
+                original = details["duplicate_of"]
+                if original not in self.outcomes:
+                    self.waiting.setdefault(original, []).append((file, details))
+                    continue
+                try:
+                    success, result, details = self.finish(file, self.outcomes[original], details)
+                except Exception as e:
+                    success, result = False, f"Duplicate of {original} could not be finished: {e}"
+                    details = dict(details, error=str(e))
+            self.outcomes[file] = (success, {key: details.get(key) for key in ("output_file", "parsed_info", "error")})
+            self.report(file, success, result, details)
+            pending.extend((dup, None, None, dup_details) for dup, dup_details in self.waiting.pop(file, []))
+
+    def close(self):
+        """Finish every duplicate whose original never reported an outcome, as failed."""
+        with self._lock:
+            while self.waiting:
+                original = next(iter(self.waiting))
+                self.outcomes[original] = (False, {"error": "the original did not finish"})
+                self._resolve([(dup, None, None, details) for dup, details in self.waiting.pop(original)])
@@ -0,0 +1,66 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import DiskCache
+from dedup import minhash
+from logs import setup_logging
+from metrics import FileMetrics, stage, track_file
+from utils import EXTRACT_SETTINGS, OCR_SETTINGS, configure_extraction, configure_ocr, extract_text_from_file
+
+# Text cache of this extraction process (set up by _init_worker)
+_text_cache = None
+
+
+def _init_worker(text_cache_settings, ocr_settings, extract_settings, log_level, log_file, log_file_level):
+    global _text_cache
+    # Every process appends its own JSON lines to the shared --log_file
+    setup_logging(log_level, log_file=log_file, log_file_level=log_file_level)
+    configure_extraction(**extract_settings)
+    # Files are already extracted in parallel, one per process, so OCR runs in-process
+    configure_ocr(dpi=ocr_settings["dpi"], max_pages=ocr_settings["max_pages"], workers=1)
+    _text_cache = DiskCache(**text_cache_settings) if text_cache_settings else None
+
+
+def _extract(file, digest=None, sign=False):
+    """
+    Runs in a worker process: (text or None, error message or None, stage seconds,
+    counters, MinHash signature of the text or None). The signature is only computed
+    with `sign`, here rather than on the OpenAI threads, where it would hold the GIL.
+    """
+    file_metrics = FileMetrics(file)
+    text_content, error, signature = None, None, None
+    with track_file(file_metrics), stage("extract"):
+        try:
+            text_content = extract_text_from_file(file, cache=_text_cache, digest=digest)
+            if sign and text_content:
+                signature = minhash(text_content)
+        except Exception as e:
+            error = str(e)
+    return text_content, error, dict(file_metrics.stages), dict(file_metrics.counters), signature
+
+
+class ExtractPool:
+    """
+    Process pool running extract_text_from_file (PyMuPDF, python-docx, antiword, tesseract)
+    off the main interpreter, so CPU-bound extraction uses every core while threads wait
+    on OpenAI. Each process opens its own handle on the text cache; OCR inside a process
+    is sequential (the pool parallelizes across files instead of pages).
+    """
+
+    def __init__(self, workers, text_cache=None, log_level="warning", log_file=None, log_file_level="info"):
+        text_cache_settings = None
+        if text_cache is not None:
+            text_cache_settings = {"directory": text_cache.directory, "max_bytes": text_cache.max_bytes,
+                                   "max_age_seconds": text_cache.max_age_seconds, "refresh": text_cache.refresh}
+        # spawn, not fork: the pool is created while OpenAI client and worker threads are running
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker,
+                                             initargs=(text_cache_settings, dict(OCR_SETTINGS), dict(EXTRACT_SETTINGS),
+                                                       log_level, log_file, log_file_level))
+
+    def submit(self, file, digest=None, sign=False):
+        """Future of (text or None, error message or None, stage seconds, counters, signature) for `file`."""
+        return self._executor.submit(_extract, file, digest, sign)
+
+    def shutdown(self):
+        self._executor.shutdown()
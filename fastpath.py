@@ -0,0 +1,237 @@
+import re
+
+from sections import clean_text, segment
+
+# Degree keywords, checked from the highest degree down
+DEGREE_KEYWORDS = (
+    ("博士", ("博士", "ph.d", "phd", "doctor of", "d.phil")),
+    ("硕士", ("硕士", "研究生", "master", "m.s.", "m.sc", "msc", "m.eng", "mphil", "m.phil", "mba")),
+    ("本科", ("本科", "学士", "bachelor", "b.s.", "b.sc", "bsc", "b.eng", "b.a.")),
+)
+DEGREE_FIELDS = {"博士": "phd_school", "硕士": "master_school", "本科": "bachelor_school"}
+# Typical programme length, to estimate the graduation year from "2022 - present"
+DEGREE_YEARS = {"博士": 4, "硕士": 2, "本科": 4}
+
+# "博士后" / postdoc is a position, not a degree; removed before looking for degree keywords
+POSTDOC = re.compile(r"博士后|post-?doc(?:toral)?", re.IGNORECASE)
+YEAR = re.compile(r"(?<!\d)(19[89]\d|20[0-4]\d)(?!\d)")
+ONGOING = re.compile(r"至今|现在|预计|\b(?:present|now|current|expected)\b", re.IGNORECASE)
+CJK_RUN = re.compile(r"[一-鿿]{2,}")
+MAJOR_LABEL = re.compile(r"专业[:：]?\s*([一-鿿]{2,15})")
+NAME_LABEL = re.compile(r"姓\s*名[:：]?\s*([一-鿿·]{2,5})|name[:：]\s*([A-Za-z][A-Za-z .'-]{1,40})", re.IGNORECASE)
+CJK_NAME = re.compile(r"^[一-鿿]{2,4}$")
+LATIN_NAME = re.compile(r"^[A-Z][a-zA-Z'-]+(?: [A-Z][a-zA-Z'-]+){1,2}$")
+BULLET = re.compile(r"^(?:[\s•·\-–—*●■◆□>]+|\d{1,2}[.、)）]\s*)+")
+LEADING_DATE = re.compile(r"^(19|20)\d{2}(?:[./]\d{1,2})?\s*[-–:：]?\s*")
+
+# Common surnames (百家姓) in pinyin, for romanized Chinese names
+PINYIN_SURNAMES = frozenset("""
+wang li zhang liu chen yang huang zhao wu zhou xu sun ma zhu hu guo he gao lin luo zheng liang xie song tang
+han feng deng cao peng zeng xiao tian dong yuan pan yu jiang cai jia ding wei xue ye yan lu du dai xia zhong
+fu qin qiu hou shao meng long wan duan lei qian tan yin bai kang mao hao gu shi qiao wen fang cui chang
+ren kong xing zou mo ou fan shen lv lyu qi hong niu ning
+""".split())
+
+# Location hints in the resume header -> country in Simplified Chinese
+LOCATION_HINTS = (
+    ("中国", ("中国", "北京", "上海", "深圳", "广州", "杭州", "南京", "成都", "武汉", "西安", "china", "beijing",
+              "shanghai", "shenzhen", "hangzhou", "+86")),
+    ("美国", ("美国", "usa", "united states", "u.s.", "california", "new york", "seattle", "boston")),
+    ("英国", ("英国", "united kingdom", "london", "u.k.")),
+    ("加拿大", ("加拿大", "canada", "toronto", "vancouver")),
+    ("新加坡", ("新加坡", "singapore", "+65")),
+    ("中国香港", ("香港", "hong kong")),
+)
+
+# Share of the confidence score each resolved part contributes (sums to 1.0)
+WEIGHTS = {"school": 0.3, "name": 0.15, "grad_year": 0.15, "major": 0.1, "location": 0.1, "awards": 0.1,
+           "degrees": 0.1}
+# Parts that must be resolved for any confidence at all: the fast path never skips the
+# parsing request for a resume whose school, major or awards it could not read
+REQUIRED = ("school", "major", "awards")
+
+
+class FastPathExtractor:
+    """
+    Rule-based resume parser for the easy cases, using the reference lists as dictionaries.
+
+    It finds the name in the header, degrees/schools/years in the education section
+    (schools must appear verbatim in the target or QS50 list), awards from the awards
+    section or verbatim award list names, and the country from header hints. It returns
+    the same fields as the OpenAI parse plus a confidence score in [0, 1]: the weighted
+    share of parts it could resolve (WEIGHTS). Without a known school or a major for the
+    highest degree, or without any award it could read (REQUIRED), the score is 0: an
+    absent part is not a resolved one.
+    """
+
+    def __init__(self, references):
+        self.references = references
+        # Longest names first, so "北京大学医学部" wins over "北京大学"
+        self.schools = sorted({e for e in references.schools.entries + references.qs50.entries if e},
+                              key=len, reverse=True)
+        award_names = set()
+        for entry in references.awards.entries + references.awards2.entries:
+            for part in entry.split(":"):
+                if len(part.strip()) >= 3:
+                    award_names.add(part.strip())
+        self.award_pattern = re.compile(
+            r"(?<![A-Za-z])(" + "|".join(re.escape(n) for n in sorted(award_names, key=len, reverse=True)) + r")(?![A-Za-z])",
+            re.IGNORECASE) if award_names else None
+
+    def find_school(self, line):
+        for school in self.schools:
+            if school in line:
+                return school
+        return None
+
+    @staticmethod
+    def _degree_of(line):
+        lowered = POSTDOC.sub(" ", line.lower())
+        for degree, keywords in DEGREE_KEYWORDS:
+            if any(k in lowered for k in keywords):
+                return degree
+        return None
+
+    def _education(self, lines):
+        """
+        {degree: (school, entry lines)} for the degrees found in the education section.
+        An entry is the degree line plus its neighbours that do not name another degree.
+        """
+        degrees = {}
+        for i, line in enumerate(lines):
+            degree = self._degree_of(line)
+            if degree is None or degree in degrees:
+                continue
+            neighbours = [l for l in (lines[i - 1] if i else None, lines[i + 1] if i + 1 < len(lines) else None)
+                          if l is not None and self._degree_of(l) is None]
+            entry = [line] + neighbours
+            school = next(filter(None, map(self.find_school, entry)), None)
+            degrees[degree] = (school, entry)
+        return degrees
+
+    @staticmethod
+    def _grad_year(degree, entry):
+        # Dates on the degree line itself win over those on neighbouring lines
+        line = next((l for l in entry if YEAR.search(l)), None)
+        if line is None:
+            return None
+        years = [int(y) for y in YEAR.findall(line)]
+        if ONGOING.search(line) and len(years) == 1 and not re.search(r"expected|预计", line, re.IGNORECASE):
+            return years[0] + DEGREE_YEARS[degree]
+        return max(years)
+
+    @staticmethod
+    def _major(entry, school):
+        line = entry[0]
+        labelled = MAJOR_LABEL.search(" ".join(entry))
+        if labelled:
+            return labelled.group(1)
+        rest = ONGOING.sub(" ", line.replace(school or "", " "))
+        for _, keywords in DEGREE_KEYWORDS:
+            for keyword in keywords:
+                rest = re.sub(re.escape(keyword), " ", rest, flags=re.IGNORECASE)
+        candidates = [run for run in CJK_RUN.findall(rest) if not run.endswith(("学院", "大学", "学校", "分校"))]
+        return candidates[0] if candidates else None
+
+    @staticmethod
+    def _name(header_lines):
+        for line in header_lines[:10]:
+            labelled = NAME_LABEL.search(line)
+            if labelled:
+                return (labelled.group(1) or labelled.group(2)).strip()
+        for line in header_lines[:3]:
+            candidate = line.split("|")[0].strip()
+            if CJK_NAME.match(candidate) or LATIN_NAME.match(candidate):
+                return candidate
+        return None
+
+    @staticmethod
+    def is_chinese_name(name):
+        if CJK_RUN.fullmatch(name.replace("·", "")):
+            return True
+        # The surname is the word in capitals ("Wei ZHANG"), else the first one ("Zhang Wei");
+        # a pinyin surname in last place ("Michael Long") is just as often an English one
+        parts = name.replace("-", " ").split()
+        if not parts:
+            return False
+        surname = next((part for part in parts if len(part) > 1 and part.isupper()), parts[0])
+        return surname.lower() in PINYIN_SURNAMES
+
+    @staticmethod
+    def _location(header_lines):
+        header = " ".join(header_lines[:10]).lower()
+        for country, hints in LOCATION_HINTS:
+            if any(hint in header for hint in hints):
+                return country
+        return None
+
+    def _awards(self, sections, lines):
+        """
+        (award names, share of them that name a reference-list award) for the resume.
+        Without an awards section, only award list names found verbatim count; if there
+        are none, the share is 0 (the resume may list awards we cannot recognize).
+        """
+        award_lines = [LEADING_DATE.sub("", BULLET.sub("", line)).strip()
+                       for name, body in sections if name == "awards" for line in body[1:]]
+        award_lines = [line for line in award_lines if line]
+        if award_lines:
+            known = [line for line in award_lines
+                     if line.isascii() and self.award_pattern is not None and self.award_pattern.search(line)]
+            return award_lines, len(known) / len(award_lines)
+        # No awards section: only awards named verbatim somewhere in the text are picked up
+        found = []
+        if self.award_pattern is not None:
+            for line in lines:
+                for match in self.award_pattern.finditer(line):
+                    if match.group(1) not in found:
+                        found.append(match.group(1))
+        return found, 1.0 if found else 0.0
+
+    def extract(self, text):
+        """Return (parsed fields, confidence in [0, 1])."""
+        lines = clean_text(text)
+        sections = segment(lines)
+        education_lines = [line for name, body in sections if name == "education" for line in body]
+        header_lines = next((body for name, body in sections if name == "header"), [])
+
+        degrees = self._education(education_lines)
+        highest = next((degree for degree, _ in DEGREE_KEYWORDS if degree in degrees), None)
+        parsed_info = {field: "NA" for field in DEGREE_FIELDS.values()}
+        for degree, (school, _) in degrees.items():
+            parsed_info[DEGREE_FIELDS[degree]] = school or "NA"
+
+        name = self._name(header_lines or lines)
+        awards, awards_resolved = self._awards(sections, lines)
+        location = self._location(header_lines or lines)
+        grad_year = major = None
+        if highest:
+            school, entry = degrees[highest]
+            grad_year = self._grad_year(highest, entry)
+            major = self._major(entry, school)
+
+        parsed_info.update({
+            "education_level": highest or "N/A",
+            "name": name or "",
+            "major": major or "",
+            "grad_year": grad_year if grad_year is not None else "",
+            "awards": awards,
+            "candidate_location": location or "未知",
+            "is_qs50": "非QS50",  # parse_content sets the real value from the QS50 list
+            "is_chinese_name": "Yes" if name and self.is_chinese_name(name) else "No",
+        })
+
+        if not highest:
+            return parsed_info, 0.0
+        resolved = {
+            "school": 1.0 if degrees[highest][0] else 0.0,
+            "name": 1.0 if name else 0.0,
+            "grad_year": 1.0 if grad_year else 0.0,
+            "major": 1.0 if major else 0.0,
+            "location": 1.0 if location else 0.0,
+            "awards": awards_resolved,
+            "degrees": 1.0 if all(school for school, _ in degrees.values()) else 0.0,
+        }
+        if not all(resolved[part] for part in REQUIRED):
+            return parsed_info, 0.0
+        confidence = sum(WEIGHTS[part] * share for part, share in resolved.items())
+        return parsed_info, round(confidence, 3)
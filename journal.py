@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+
+JOURNAL_FILENAME = "journal.jsonl"
+RESUME_EXTENSIONS = (".pdf", ".docx", ".doc")
+
+
+def iter_resume_files(source_dir, recursive=False, exclude_dirs=()):
+    """
+    Lazily yield the paths of PDF/DOCX/DOC files under `source_dir`, directory by
+    directory, without building the full list first. Directories in `exclude_dirs`
+    (e.g. an output directory inside the source tree) are skipped.
+    """
+    excluded = {os.path.realpath(d) for d in exclude_dirs}
+    pending = [source_dir]
+    while pending:
+        directory = pending.pop()
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and os.path.realpath(entry.path) not in excluded:
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(RESUME_EXTENSIONS) and not entry.name.startswith("~$"):
+                    # ~$name.docx are Word lock files, not resumes
+                    yield entry.path
+        pending.extend(reversed(subdirs))
+
+
+def watch_resume_files(source_dir, recursive=False, exclude_dirs=(), interval=2.0, settle_seconds=3.0,
+                       skip=None, stop=None):
+    """
+    Poll `source_dir` forever (until `stop` is set) and yield lists of newly arrived resume
+    paths. A file is only reported once its size and mtime have stayed the same for
+    `settle_seconds`, so files still being copied in are not picked up half-written.
+    A file replaced under the same name (new size or mtime) is reported again.
+    Files for which `skip(path)` is true are ignored.
+    """
+    seen = {}      # path -> signature it was reported (or skipped) with
+    settling = {}  # path -> (signature, time the signature was first observed)
+    while stop is None or not stop.is_set():
+        now = time.monotonic()
+        ready = []
+        present = set()
+        for path in iter_resume_files(source_dir, recursive=recursive, exclude_dirs=exclude_dirs):
+            present.add(path)
+            try:
+                signature = file_signature(path)
+            except OSError:
+                continue
+            if seen.get(path) == signature:
+                continue
+            previous = settling.get(path)
+            if previous is None or previous[0] != signature:
+                settling[path] = (signature, now)
+            elif now - previous[1] >= settle_seconds:
+                del settling[path]
+                seen[path] = signature
+                if skip is None or not skip(path):
+                    ready.append(path)
+        # Forget files that were removed (or moved to the output directory)
+        for table in (seen, settling):
+            for path in [path for path in table if path not in present]:
+                del table[path]
+        if ready:
+            yield ready
+        if stop is not None:
+            stop.wait(interval)
+        else:
+            time.sleep(interval)
+
+
+def file_signature(path):
+    """(size, mtime_ns) of a file, used to notice a resume that was replaced under the same name."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_journal(path):
+    """
+    Read a journal and return {relative file path: last record}. A truncated last line
+    (e.g. from a crash mid-write) and lines that are not file records are ignored.
+    """
+    records = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict) or not isinstance(record.get("file"), str):
+                    continue
+                records[record["file"]] = record
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class Journal:
+    """
+    Append-only JSONL log of per-file outcomes, kept in the output directory.
+    One line per processed resume, flushed immediately, so a crashed run can be
+    resumed with --resume without redoing finished files.
+    """
+
+    def __init__(self, output_dir, source_dir, append=True):
+        self.path = os.path.join(output_dir, JOURNAL_FILENAME)
+        self.source_dir = source_dir
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        if append and self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")  # finish a line cut off by a crash
+
+    def key(self, path):
+        return os.path.relpath(path, self.source_dir)
+
+    def is_done(self, records, path):
+        """True if `path` was already processed successfully and has not changed since."""
+        record = records.get(self.key(path))
+        if not record or not record.get("success"):
+            return False
+        try:
+            return list(file_signature(path)) == record.get("signature")
+        except OSError:
+            return False
+
+    def record(self, path, success, message, details=None):
+        entry = {
+            "file": self.key(path),
+            "success": success,
+            "message": message,
+        }
+        try:
+            entry["signature"] = list(file_signature(path))
+        except OSError:
+            pass
+        if details:
+            entry.update(details)
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
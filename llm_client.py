@@ -0,0 +1,219 @@
+import asyncio
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: throttling, timeouts, dropped connections and 5xx responses
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class _RateLimiter:
+    """Token bucket refilled continuously at `per_minute` units per minute (0 = unlimited)."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount):
+        if not self.per_minute:
+            return
+        amount = min(amount, self.per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def consume(self, amount):
+        """Charge extra usage discovered after the fact (may leave the bucket in debt)."""
+        if self.per_minute and amount > 0:
+            self._refill()
+            self.level -= amount
+
+
+class LLMClient:
+    """
+    One OpenAI client shared by every call site and worker thread.
+
+    Requests run on a private asyncio loop in a background thread, on an AsyncOpenAI
+    client with a pooled httpx connection. Callers use the blocking `chat()`, so the
+    threaded pipeline does not have to be async. Each request
+      - waits for a free slot (at most `max_in_flight` requests at once),
+      - waits for the requests-per-minute and tokens-per-minute budgets,
+      - is retried on 429/5xx/timeouts/connection errors with exponential backoff and
+        full jitter, honouring Retry-After when the server sends it.
+    Set `base_url` (or OPENAI_BASE_URL) to point it at a local mock server.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_in_flight=8, requests_per_minute=0,
+                 tokens_per_minute=0, max_retries=5, backoff_base=1.0, backoff_max=60.0, timeout=120.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0  # requests that failed for good; also counted in `requests`
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+        async def setup():
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+                timeout=timeout,
+            )
+            self._client = AsyncOpenAI(
+                api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+                base_url=base_url or os.environ.get("OPENAI_BASE_URL") or None,
+                http_client=self._http_client,
+                max_retries=0,  # retries are handled here, with the rate limiters in the loop
+            )
+            self._slots = asyncio.Semaphore(max_in_flight)
+            self._request_budget = _RateLimiter(requests_per_minute)
+            self._token_budget = _RateLimiter(tokens_per_minute)
+
+        self._run(setup())
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    def estimate_tokens(messages, max_tokens=None):
+        """Rough prompt + completion token estimate used to reserve tokens-per-minute budget."""
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+        return prompt_chars // 3 + (max_tokens or 512)
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+    async def achat(self, messages, model, **kwargs):
+        """
+        Create a chat completion; returns the SDK completion object. A request that fails
+        for good is still counted, and the error carries the retries it used (`retries`).
+        """
+        estimate = self.estimate_tokens(messages, kwargs.get("max_tokens"))
+        attempt = 0
+        try:
+            while True:
+                await self._request_budget.acquire(1)
+                await self._token_budget.acquire(estimate)
+                async with self._slots:
+                    try:
+                        completion = await self._client.chat.completions.create(model=model, messages=messages,
+                                                                                **kwargs)
+                    except RETRYABLE_ERRORS as e:
+                        if attempt >= self.max_retries:
+                            raise
+                        delay = self._backoff(attempt, e)
+                        attempt += 1
+                        self.retries += 1
+                        logger.warning("OpenAI request failed (%s); retry %s/%s in %.1fs", type(e).__name__, attempt, self.max_retries, delay)
+                    else:
+                        break
+                await asyncio.sleep(delay)
+        except Exception as e:
+            self.requests += 1
+            self.failures += 1
+            e.retries = attempt
+            raise
+
+        self.requests += 1
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+            self._token_budget.consume((usage.total_tokens or 0) - estimate)
+        completion.retries = attempt
+        return completion
+
+    def chat(self, messages, model, **kwargs):
+        """
+        Blocking wrapper around achat(), safe to call from any thread. Tokens and retries
+        are charged to the resume being processed in the calling thread (see metrics).
+        """
+        try:
+            completion = self._run(self.achat(messages, model, **kwargs))
+        except Exception as e:
+            metrics.count_llm_failure(e)
+            raise
+        metrics.count_llm_call(completion)
+        return completion
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+
+        async def shutdown():
+            await self._http_client.aclose()
+
+        try:
+            self._run(shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_client(**settings):
+    """Replace the shared client with one built from `settings` (see LLMClient)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = LLMClient(**settings)
+        return _client
+
+
+def get_client():
+    """The shared LLMClient, created with default settings on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
+
+
+def chat_completion(messages, model, **kwargs):
+    """Send a chat completion through the shared client (see LLMClient.achat)."""
+    return get_client().chat(messages, model, **kwargs)
+
+
+@atexit.register
+def _close_client():
+    if _client is not None:
+        _client.close()
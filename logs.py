@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+LOG_LEVELS = ("debug", "info", "warning", "error")
+
+# Libraries that log every HTTP request at INFO/DEBUG
+NOISY_LOGGERS = ("httpx", "httpcore", "openai", "PIL", "pdfminer")
+
+_local = threading.local()
+
+
+@contextmanager
+def log_context(file_id, file=None):
+    """Tag every log record emitted by this thread inside the block with the resume being processed."""
+    previous = getattr(_local, "context", None)
+    _local.context = (file_id, file)
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+class _ContextFilter(logging.Filter):
+    """Adds `file_id`, `file` and a ready-made `file_tag` ("[#12] " or "") to each record."""
+
+    def filter(self, record):
+        file_id, file = getattr(_local, "context", None) or (None, None)
+        record.file_id = file_id
+        record.file = file
+        record.file_tag = f"[#{file_id}] " if file_id is not None else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers and jq."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "file_id": getattr(record, "file_id", None),
+            "file": getattr(record, "file", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class AppendFileHandler(logging.Handler):
+    """
+    Appends each record to `path` with a single os.write on an O_APPEND descriptor. The
+    extraction processes log to the same file as the main process, and a buffered
+    FileHandler may split a large record (e.g. a raw OpenAI response at DEBUG) into
+    several writes that interleave with the other processes' lines.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + "\n").encode("utf-8")
+            while data:  # a short write is only possible on a full disk or a signal
+                data = data[os.write(self.fd, data):]
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+        finally:
+            self.release()
+        super().close()
+
+
+def setup_logging(level="warning", log_file=None, log_file_level="info"):
+    """
+    Send log records at `level` and above to stderr as "[LEVEL] [#file] message" lines and,
+    if `log_file` is given, records at `log_file_level` and above to it as JSON lines.
+    Records below both levels are dropped before their message is formatted.
+    """
+    console_level = getattr(logging, level.upper())
+    context = _ContextFilter()
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter("[%(levelname)s] %(file_tag)s%(message)s"))
+    console.addFilter(context)
+    handlers = [console]
+    root_level = console_level
+
+    if log_file:
+        file_level = getattr(logging, log_file_level.upper())
+        file_handler = AppendFileHandler(log_file)
+        file_handler.setLevel(file_level)
+        file_handler.setFormatter(JsonFormatter())
+        file_handler.addFilter(context)
+        handlers.append(file_handler)
+        root_level = min(root_level, file_level)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(root_level)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(root_level, logging.WARNING))
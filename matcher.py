@@ -0,0 +1,374 @@
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+
+from cache import make_key
+from school_names import NORMALIZATION_ID, canonical_school
+
+logger = logging.getLogger(__name__)
+
+# Slack applied to the float bounds below so pruning never rejects a borderline candidate
+_EPS = 1e-9
+
+
+def load_reference_list(path, keep_blank=True):
+    """Read a reference list file (one entry per line), stripping whitespace."""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = [line.strip() for line in f]
+    if not keep_blank:
+        entries = [e for e in entries if e]
+    return entries
+
+
+# Compiled table file layout (native byte order, recorded in the header): a fixed header,
+# then one (offset, length) pair per section, then the 8-byte aligned sections.
+TABLES_MAGIC = b"RIDX"
+TABLES_VERSION = 1
+_HEADER = struct.Struct("<4sIIII")  # magic, version, flags, entry count, token count
+_SECTION = struct.Struct("<QQ")
+_LOWERCASE = 0x1
+_BIG_ENDIAN = 0x2
+_SCHOOL_NAMES = 0x4
+# Sections: name -> array typecode (None = raw bytes)
+_SECTIONS = (
+    ("fingerprint", None),
+    ("entries", None), ("entry_offsets", "I"),    # original entries, utf-8
+    ("keys", None), ("key_offsets", "I"),          # normalized entries, utf-8
+    ("lengths", "I"),                              # key length in characters, by id
+    ("by_length", "I"), ("sorted_lengths", "I"),  # ids sorted by key length, and those lengths
+    ("by_key", "I"),                               # ids sorted by key, for exact hits
+    ("tokens", "Q"), ("token_offsets", "I"),       # sorted (char, k) tokens, start of their postings
+    ("postings", "I"),                             # ids of entries containing char at least k times
+)
+
+
+def _token(char, k):
+    return (ord(char) << 16) | k
+
+
+def _overlap(counts, text):
+    """Size of the multiset intersection of `counts` (a Counter) and the characters of `text`."""
+    remaining = dict(counts)
+    overlap = 0
+    for char in text:
+        if remaining.get(char, 0) > 0:
+            remaining[char] -= 1
+            overlap += 1
+    return overlap
+
+
+def _blob(strings):
+    """utf-8 blob of `strings` and the byte offset of each one (plus the end)."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join(encoded), offsets
+
+
+def compile_tables(entries, lowercase=False, school_names=False):
+    """Build the lookup tables of a ReferenceIndex and return them as one bytes object."""
+    keys = [ReferenceIndex.normalize_text(e, lowercase, school_names) for e in entries]
+    lengths = array("I", (len(k) for k in keys))
+    by_length = array("I", sorted(range(len(keys)), key=lengths.__getitem__))
+    postings = {}
+    for i, key in enumerate(keys):
+        for char, n in Counter(key).items():
+            for k in range(1, n + 1):
+                postings.setdefault(_token(char, k), []).append(i)
+    tokens = array("Q", sorted(postings))
+    token_offsets = array("I", [0])
+    flat = array("I")
+    for token in tokens:
+        flat.extend(postings[token])
+        token_offsets.append(len(flat))
+
+    entry_blob, entry_offsets = _blob(entries)
+    key_blob, key_offsets = _blob(keys)
+    sections = {
+        "fingerprint": make_key(*entries).encode('ascii'),
+        "entries": entry_blob, "entry_offsets": entry_offsets,
+        "keys": key_blob, "key_offsets": key_offsets,
+        "lengths": lengths,
+        "by_length": by_length, "sorted_lengths": array("I", (lengths[i] for i in by_length)),
+        "by_key": array("I", sorted(range(len(keys)), key=keys.__getitem__)),
+        "tokens": tokens, "token_offsets": token_offsets,
+        "postings": flat,
+    }
+    flags = ((_LOWERCASE if lowercase else 0) | (_SCHOOL_NAMES if school_names else 0)
+             | (_BIG_ENDIAN if sys.byteorder == "big" else 0))
+    header = _HEADER.pack(TABLES_MAGIC, TABLES_VERSION, flags, len(entries), len(tokens))
+    position = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table, body = [], []
+    for name, _ in _SECTIONS:
+        data = sections[name]
+        data = data.tobytes() if isinstance(data, array) else data
+        padding = -position % 8
+        body.append(b"\0" * padding + data)
+        position += padding
+        table.append(_SECTION.pack(position, len(data)))
+        position += len(data)
+    return header + b"".join(table) + b"".join(body)
+
+
+class ReferenceIndex:
+    """
+    A reference list (target schools, awards, QS50) compiled once for repeated lookups.
+
+    Entries are normalized a single time (strip, optionally lower; school lists go
+    through school_names.canonical_school) and kept in flat, read-only tables
+    (compile_tables), which can be saved to a file and memory-mapped by later runs
+    (ReferenceIndex.open) instead of being rebuilt:
+      - entries sorted by key, for exact hits
+      - entry ids sorted by length, for length-bucket filtering
+      - character postings: token (char, k) -> ids of entries containing char at least k times
+      - per-entry character counts, used as cheap upper bounds on the SequenceMatcher ratio.
+
+    A fuzzy lookup only scores a handful of candidates. SequenceMatcher's ratio is
+    2*M / (len(a) + len(b)) where M never exceeds the multiset character overlap, so
+    for ratio >= threshold an entry must (1) have a length inside a window around the
+    query length and (2) share at least `needed` character tokens with the query. By
+    the prefix-filtering argument, it then has to contain one of the query's
+    `len(query) - needed + 1` rarest tokens, so only those postings are read.
+    Lookups return the same decisions as comparing against every entry with
+    SequenceMatcher(None, query, entry).ratio().
+    """
+
+    def __init__(self, entries, lowercase=False, name="", school_names=False):
+        self.name = name
+        self.path = None  # compiled table file, when loaded from or saved to one
+        self._attach(compile_tables(list(entries), lowercase, school_names))
+
+    @classmethod
+    def open(cls, path, name=""):
+        """Memory-map tables written by save(), instead of compiling the list again."""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = cls.__new__(cls)
+        index.name = name or path
+        index.path = path
+        index._attach(buffer)
+        return index
+
+    def save(self, path):
+        """Write the compiled tables to `path` (atomically, via a temp file)."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._buffer)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.path = path
+
+    def _attach(self, buffer):
+        magic, version, flags, count, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != TABLES_MAGIC or version != TABLES_VERSION:
+            raise ValueError("not a compiled reference table file (or an older version)")
+        if bool(flags & _BIG_ENDIAN) != (sys.byteorder == "big"):
+            raise ValueError("compiled reference tables were written on a machine with another byte order")
+        self._buffer = buffer
+        self.lowercase = bool(flags & _LOWERCASE)
+        self.school_names = bool(flags & _SCHOOL_NAMES)
+        self._count = count
+        view = memoryview(buffer)
+        for i, (name, typecode) in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(buffer, _HEADER.size + i * _SECTION.size)
+            section = view[offset:offset + length]
+            setattr(self, "_" + name, section.cast(typecode) if typecode else section)
+        # Changes whenever the list content changes; used to invalidate derived caches
+        self.fingerprint = self._fingerprint.tobytes().decode('ascii')
+        self._entry_list = None
+
+    @classmethod
+    def from_file(cls, path, lowercase=False, keep_blank=True, name="", compiled_dir=None, school_names=False):
+        """
+        Build the index of a list file. With `compiled_dir`, the compiled tables are kept
+        there, keyed by the list path and content, and memory-mapped on later runs instead
+        of rebuilt. Tables of earlier versions of the same list are deleted.
+        """
+        entries = load_reference_list(path, keep_blank=keep_blank)
+        name = name or path
+        if not compiled_dir:
+            return cls(entries, lowercase=lowercase, name=name, school_names=school_names)
+        normalization = NORMALIZATION_ID if school_names else ""
+        prefix = make_key(os.path.abspath(path))[:16] + "-"
+        compiled_path = os.path.join(compiled_dir, prefix + make_key("tables", str(TABLES_VERSION), str(lowercase),
+                                                                     normalization, *entries) + ".ridx")
+        index = None
+        if os.path.exists(compiled_path):
+            try:
+                index = cls.open(compiled_path, name=name)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning("Rebuilding compiled reference tables %s: %s", compiled_path, e)
+        if index is None:
+            index = cls(entries, lowercase=lowercase, name=name, school_names=school_names)
+            try:
+                index.save(compiled_path)
+            except OSError as e:
+                logger.warning("Could not save compiled reference tables to %s: %s", compiled_path, e)
+                return index
+        _remove_stale_tables(compiled_dir, prefix, keep=os.path.basename(compiled_path))
+        return index
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def entries(self):
+        """The original entries, as a list (decoded on first use)."""
+        if self._entry_list is None:
+            self._entry_list = [self._entry(i) for i in range(self._count)]
+        return self._entry_list
+
+    def _entry(self, i):
+        return self._entries[self._entry_offsets[i]:self._entry_offsets[i + 1]].tobytes().decode('utf-8')
+
+    def _key(self, i):
+        return self._keys[self._key_offsets[i]:self._key_offsets[i + 1]].tobytes().decode('utf-8')
+
+    def _postings_of(self, token):
+        i = bisect_left(self._tokens, token)
+        if i == len(self._tokens) or self._tokens[i] != token:
+            return ()
+        return self._postings[self._token_offsets[i]:self._token_offsets[i + 1]]
+
+    @staticmethod
+    def normalize_text(text, lowercase=False, school_names=False):
+        if school_names:
+            return canonical_school(text)
+        text = text.strip()
+        return text.lower() if lowercase else text
+
+    def normalize(self, text):
+        return self.normalize_text(text, self.lowercase, self.school_names)
+
+    def contains(self, query):
+        """Exact match (after normalization)."""
+        key = self.normalize(query)
+        i = bisect_left(self._by_key, key, key=self._key)
+        return i < self._count and self._key(self._by_key[i]) == key
+
+    def best_match(self, query, threshold, stop_at_first=False):
+        """
+        Return (entry, ratio) for the entry with the highest ratio >= threshold,
+        preferring the earliest entry on ties. Return (None, 0.0) if nothing qualifies.
+        With stop_at_first, return the first entry that reaches the threshold instead.
+        """
+        key = self.normalize(query)
+        key_len = len(key)
+        key_counts = Counter(key)
+
+        best_entry, best_ratio = None, 0.0
+        for i in self._candidates(key, key_counts, threshold):
+            # Anything that cannot reach the threshold (or beat the current best) is skipped.
+            floor = threshold if best_entry is None else best_ratio
+            strict = best_entry is not None
+            entry_len = self._lengths[i]
+            total = key_len + entry_len
+
+            # Same bound as SequenceMatcher.real_quick_ratio()
+            bound = 2.0 * min(key_len, entry_len) / total if total else 1.0
+            if bound < floor or (strict and bound == floor):
+                continue
+            # Same bound as SequenceMatcher.quick_ratio()
+            entry_key = self._key(i)
+            overlap = _overlap(key_counts, entry_key)
+            bound = 2.0 * overlap / total if total else 1.0
+            if bound < floor or (strict and bound == floor):
+                continue
+
+            ratio = SequenceMatcher(None, key, entry_key).ratio()
+            if ratio >= threshold and ratio > best_ratio:
+                best_entry, best_ratio = self._entry(i), ratio
+                if stop_at_first:
+                    break
+        return best_entry, best_ratio
+
+    def _candidates(self, key, key_counts, threshold):
+        """Ids (ascending) of every entry that could reach `threshold` against `key`."""
+        if threshold <= 0:
+            return range(self._count)
+        if threshold > 1:
+            return []
+
+        key_len = len(key)
+        # 2*min(la, lb) / (la + lb) >= threshold bounds the entry length from both sides
+        min_len = max(0, math.ceil(key_len * threshold / (2 - threshold) - _EPS))
+        max_len = math.floor(key_len * (2 - threshold) / threshold + _EPS)
+        lo = bisect_left(self._sorted_lengths, min_len)
+        hi = bisect_right(self._sorted_lengths, max_len)
+
+        # Minimum character overlap for the shortest admissible entry
+        needed = math.ceil(threshold * (key_len + min_len) / 2 - _EPS)
+        if needed <= 0:
+            # Nothing to prune on (e.g. empty query): fall back to the length bucket
+            return sorted(self._by_length[lo:hi])
+
+        postings = [self._postings_of(_token(char, k)) for char, n in key_counts.items() for k in range(1, n + 1)]
+        postings.sort(key=len)
+        ids = set()
+        for ids_with_token in postings[:key_len - needed + 1]:
+            ids.update(ids_with_token)
+        return sorted(i for i in ids if min_len <= self._lengths[i] <= max_len)
+
+    def fuzzy_contains(self, query, threshold):
+        """True if any entry has a SequenceMatcher ratio >= threshold."""
+        return self.best_match(query, threshold, stop_at_first=True)[0] is not None
+
+
+def _remove_stale_tables(compiled_dir, prefix, keep):
+    """Delete the compiled tables in `compiled_dir` starting with `prefix`, except `keep`."""
+    try:
+        names = os.listdir(compiled_dir)
+    except OSError:
+        return
+    for file_name in names:
+        if file_name.startswith(prefix) and file_name.endswith(".ridx") and file_name != keep:
+            try:
+                os.unlink(os.path.join(compiled_dir, file_name))
+            except OSError as e:
+                logger.warning("Could not remove stale reference tables %s: %s", file_name, e)
+
+
+class ReferenceData:
+    """All reference lists used while parsing a resume, loaded once per run."""
+
+    def __init__(self, schools, awards, awards2, qs50):
+        self.schools = schools
+        self.awards = awards
+        self.awards2 = awards2
+        self.qs50 = qs50
+
+
+def load_reference_data(args):
+    """
+    Build the ReferenceData indexes from the list paths given on the command line.
+    Unless --no-cache is given, compiled tables are kept under <cache_dir>/references
+    and memory-mapped by later runs.
+    """
+    compiled_dir = None if args.no_cache else os.path.join(args.cache_dir, "references")
+
+    def build(path, **kwargs):
+        if not path:
+            return ReferenceIndex([], **kwargs)
+        return ReferenceIndex.from_file(path, compiled_dir=compiled_dir, **kwargs)
+
+    return ReferenceData(
+        schools=build(args.target_list, name="target_list", school_names=True),
+        awards=build(args.award_list, lowercase=True, name="award_list"),
+        awards2=build(args.award_list2, lowercase=True, name="award_list2"),
+        qs50=build(args.qs50_list, keep_blank=False, name="qs50_list", school_names=True),
+    )
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Pipeline stages, in the order they are reported. "ocr" time is also part of "extract".
+STAGES = ("total", "extract", "ocr", "parse", "school_match", "award_match", "output")
+COUNTERS = ("bytes", "pages", "ocr_pages", "fast_path", "llm_requests", "llm_retries", "llm_failures",
+            "prompt_tokens", "completion_tokens")
+QUANTILES = (0.5, 0.95, 0.99)
+
+_local = threading.local()
+
+
+class FileMetrics:
+    """Wall time per stage and resource counters for one resume."""
+
+    def __init__(self, file):
+        self.file = file
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    def timings(self):
+        return {name: round(self.stages[name], 3) for name in STAGES if name in self.stages}
+
+    def usage(self):
+        return {name: self.counters[name] for name in COUNTERS if name in self.counters}
+
+
+class MetricsCollector:
+    """Aggregates FileMetrics over a run; usage outside any resume (e.g. batched parsing) is kept separately."""
+
+    def __init__(self):
+        self.stage_samples = defaultdict(list)
+        self.totals = defaultdict(int)
+        self.files = 0
+        self._lock = threading.Lock()
+
+    def add(self, file_metrics):
+        with self._lock:
+            self.files += 1
+            for name, seconds in file_metrics.stages.items():
+                self.stage_samples[name].append(seconds)
+            for name, value in file_metrics.counters.items():
+                self.totals[name] += value
+
+    def count_unattributed(self, name, amount):
+        with self._lock:
+            self.totals[name] += amount
+
+    def stage_stats(self):
+        """{stage: {"count", "sum", "p50", "p95", "p99"}} over every resume that went through the stage."""
+        stats = {}
+        with self._lock:
+            for name in STAGES:
+                samples = sorted(self.stage_samples.get(name, ()))
+                if not samples:
+                    continue
+                entry = {"count": len(samples), "sum": round(sum(samples), 3)}
+                for q in QUANTILES:
+                    entry[f"p{int(q * 100)}"] = round(_percentile(samples, q), 3)
+                stats[name] = entry
+        return stats
+
+    def summary_text(self):
+        lines = [
+            "[STAGE TIMINGS] (seconds per resume)",
+            "----------------------------------------",
+            f" {'stage':<13}{'count':>6}{'p50':>9}{'p95':>9}{'p99':>9}",
+        ]
+        for name, entry in self.stage_stats().items():
+            lines.append(f" {name:<13}{entry['count']:>6}{entry['p50']:>9.2f}{entry['p95']:>9.2f}{entry['p99']:>9.2f}")
+        lines.append("----------------------------------------")
+        for name in COUNTERS:
+            lines.append(f" {name}: {self.totals.get(name, 0)}")
+        lines.append("========================================")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        return json.dumps({"files": self.files, "stages": self.stage_stats(),
+                           "totals": {name: self.totals.get(name, 0) for name in COUNTERS}}, indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP resumeclt_stage_seconds Wall time per resume spent in each pipeline stage.",
+            "# TYPE resumeclt_stage_seconds summary",
+        ]
+        for name, entry in self.stage_stats().items():
+            for q in QUANTILES:
+                lines.append(f'resumeclt_stage_seconds{{stage="{name}",quantile="{q}"}} {entry[f"p{int(q * 100)}"]}')
+            lines.append(f'resumeclt_stage_seconds_sum{{stage="{name}"}} {entry["sum"]}')
+            lines.append(f'resumeclt_stage_seconds_count{{stage="{name}"}} {entry["count"]}')
+        lines += [
+            "# HELP resumeclt_files_total Resumes processed.",
+            "# TYPE resumeclt_files_total counter",
+            f"resumeclt_files_total {self.files}",
+        ]
+        for name in COUNTERS:
+            lines += [f"# TYPE resumeclt_{name}_total counter", f"resumeclt_{name}_total {self.totals.get(name, 0)}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt="json"):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus() if fmt == "prometheus" else self.to_json())
+
+
+def _percentile(sorted_samples, q):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_samples) * q // 1))  # ceil(n * q)
+    return sorted_samples[int(rank) - 1]
+
+
+# The run-wide collector; every resume's FileMetrics is added to it
+collector = MetricsCollector()
+
+
+@contextmanager
+def track_file(file_metrics):
+    """Attribute stages and counters recorded in this thread to `file_metrics`."""
+    previous = getattr(_local, "metrics", None)
+    _local.metrics = file_metrics
+    try:
+        yield file_metrics
+    finally:
+        _local.metrics = previous
+
+
+@contextmanager
+def stage(name):
+    """Add the wall time of the block to stage `name` of the resume tracked in this thread."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        file_metrics = getattr(_local, "metrics", None)
+        if file_metrics is not None:
+            file_metrics.stages[name] += time.perf_counter() - start
+
+
+def count(name, amount=1):
+    """Add to counter `name` of the resume tracked in this thread (or the run totals if none)."""
+    file_metrics = getattr(_local, "metrics", None)
+    if file_metrics is not None:
+        file_metrics.counters[name] += amount
+    else:
+        collector.count_unattributed(name, amount)
+
+
+def count_llm_call(completion):
+    """Record one OpenAI completion: request, retries and token usage."""
+    count("llm_requests")
+    retries = getattr(completion, "retries", 0)
+    if retries:
+        count("llm_retries", retries)
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        count("prompt_tokens", usage.prompt_tokens or 0)
+        count("completion_tokens", usage.completion_tokens or 0)
+
+
+def count_llm_failure(error):
+    """Record one OpenAI call that failed for good (after its retries, if any)."""
+    count("llm_requests")
+    count("llm_failures")
+    retries = getattr(error, "retries", 0)
+    if retries:
+        count("llm_retries", retries)
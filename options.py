@@ -3,6 +3,24 @@
 # --output_dir: Directory where the output files will be stored
 # (optional)
 # --target_list: File containing the list of target schools
+# --recursive: Also look for resumes in subdirectories of source_dir
+# --resume: Skip resumes already completed according to output_dir/journal.jsonl
+# --watch: Keep running and process new resumes as they are dropped into source_dir
+# --workers: Number of resumes processed concurrently (default 1, sequential)
+# --extract_workers / --queue_size: Separate process pool for text extraction, feeding the --workers threads
+# --parse_batch_size: Number of short resumes parsed per OpenAI request (default 1, no batching)
+# --ocr_dpi / --ocr_max_pages / --ocr_workers: Scanned-PDF OCR settings
+# --extract_max_pages / --extract_max_chars: Stop reading a PDF/DOCX once enough text was collected
+# --doc_timeout: Time limit for the antiword / LibreOffice fallbacks of .doc files
+# --prompt_max_chars / --no_trim_prompt: Size cap and section trimming of the parsing prompt
+# --fast_path / --fast_path_min_confidence: Parse easy resumes locally, without OpenAI
+# --openai_base_url / --max_in_flight / --rpm / --tpm / --max_retries: Shared OpenAI client settings
+# --no_dedup / --near_duplicate_threshold: Reuse the result of an earlier copy for duplicate resumes
+# --output_mode: How resumes are put into output_dir (copy, hardlink, reflink, symlink or move)
+# --results_format / --results_file: Machine-readable per-resume results (jsonl, csv, parquet or none)
+# --metrics_file / --metrics_format: Per-stage timing percentiles and token usage (json or prometheus)
+# --log_level / --log_file / --log_file_level: Console verbosity and an optional JSON-lines log file
+# --cache_dir / --no-cache / --refresh-cache: On-disk cache of OpenAI parsing results
 
 import argparse
 
@@ -21,6 +39,98 @@ def parse_args():
                         help='Path to the award titles list file.')
     parser.add_argument('--qs50_list', type=str, required=False, default="qs50.txt",
                         help='Path to your qs50.txt file.')
+    parser.add_argument('--recursive', action='store_true',
+                        help='Also process resumes in subdirectories of source_dir.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run: skip files already completed in output_dir/journal.jsonl.')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and process new resumes as they appear in source_dir (Ctrl+C to stop).')
+    parser.add_argument('--watch_interval', type=float, required=False, default=2.0,
+                        help='Seconds between checks of source_dir in --watch mode.')
+    parser.add_argument('--watch_settle', type=float, required=False, default=3.0,
+                        help='Seconds a new file must stay unchanged before it is processed in --watch mode.')
+    parser.add_argument('--workers', type=int, required=False, default=1,
+                        help='Number of resumes to process concurrently (extraction, OpenAI parsing and copying).')
+    parser.add_argument('--extract_workers', type=int, required=False, default=0,
+                        help='Extract text on this many processes, separately from the --workers OpenAI threads '
+                             '(0 = extract in the --workers threads).')
+    parser.add_argument('--queue_size', type=int, required=False, default=0,
+                        help='With --extract_workers: maximum extracted resumes waiting for an OpenAI thread '
+                             '(0 = 2 x workers x parse_batch_size).')
+    parser.add_argument('--parse_batch_size', type=int, required=False, default=1,
+                        help='Pack up to this many short resumes into one OpenAI parsing request.')
+    parser.add_argument('--parse_batch_max_chars', type=int, required=False, default=4000,
+                        help='Only resumes with at most this many characters of text are batched.')
+    parser.add_argument('--ocr_dpi', type=int, required=False, default=200,
+                        help='Resolution used to render scanned PDF pages for OCR.')
+    parser.add_argument('--ocr_max_pages', type=int, required=False, default=0,
+                        help='Only OCR the first N pages of a scanned PDF (0 = all pages).')
+    parser.add_argument('--ocr_workers', type=int, required=False, default=0,
+                        help='Number of tesseract processes for OCR (0 = number of CPUs).')
+    parser.add_argument('--extract_max_pages', type=int, required=False, default=0,
+                        help='Only extract the first N pages of a PDF (0 = all pages).')
+    parser.add_argument('--extract_max_chars', type=int, required=False, default=0,
+                        help='Stop extracting a PDF/DOCX once this many characters were collected (0 = no limit).')
+    parser.add_argument('--doc_timeout', type=float, required=False, default=30,
+                        help='Seconds antiword or LibreOffice may take on one .doc file before it is given up on.')
+    parser.add_argument('--prompt_max_chars', type=int, required=False, default=6000,
+                        help='Cap on the resume text sent for parsing, after trimming to the needed sections (0 = no cap).')
+    parser.add_argument('--no_trim_prompt', '--no-trim-prompt', action='store_true',
+                        help='Send the full extracted text for parsing instead of only the needed sections.')
+    parser.add_argument('--fast_path', action='store_true',
+                        help='Parse resumes with a clean education block naming listed schools locally, without OpenAI.')
+    parser.add_argument('--fast_path_min_confidence', type=float, required=False, default=0.9,
+                        help='Minimum confidence (0-1) of the local parse; below it the resume is parsed by OpenAI.')
+    parser.add_argument('--openai_base_url', type=str, required=False, default=None,
+                        help='OpenAI-compatible API base URL (default: OPENAI_BASE_URL or the OpenAI API).')
+    parser.add_argument('--max_in_flight', type=int, required=False, default=8,
+                        help='Maximum number of concurrent OpenAI requests.')
+    parser.add_argument('--rpm', type=int, required=False, default=0,
+                        help='OpenAI requests-per-minute budget (0 = unlimited).')
+    parser.add_argument('--tpm', type=int, required=False, default=0,
+                        help='OpenAI tokens-per-minute budget (0 = unlimited).')
+    parser.add_argument('--max_retries', type=int, required=False, default=5,
+                        help='Retries for rate-limited or failed OpenAI requests, with exponential backoff.')
+    parser.add_argument('--no_dedup', '--no-dedup', action='store_true',
+                        help='Process duplicate resumes separately instead of reusing the first copy\'s result.')
+    parser.add_argument('--near_duplicate_threshold', type=float, required=False, default=0.9,
+                        help='Text similarity (0-1) from which a resume counts as a near-duplicate of an earlier one '
+                             '(0 = only byte-identical files).')
+    parser.add_argument('--output_mode', type=str, required=False, default="copy",
+                        choices=["copy", "hardlink", "reflink", "symlink", "move"],
+                        help='How resumes are put into output_dir: copy, hardlink or reflink (no extra disk space, '
+                             'fall back to copy), symlink, or move (the resume leaves source_dir).')
+    parser.add_argument('--results_format', type=str, required=False, default="jsonl",
+                        choices=["jsonl", "csv", "parquet", "none"],
+                        help='Format of the per-resume results file written next to the renamed resumes.')
+    parser.add_argument('--results_file', type=str, required=False, default=None,
+                        help='Path of the results file (default: output_dir/results.<format>).')
+    parser.add_argument('--metrics_file', type=str, required=False, default=None,
+                        help='Write per-stage timing percentiles and OpenAI/OCR usage totals to this file.')
+    parser.add_argument('--metrics_format', type=str, required=False, default="json",
+                        choices=["json", "prometheus"],
+                        help='Format of --metrics_file: JSON, or Prometheus text exposition (e.g. for node_exporter).')
+    parser.add_argument('--log_level', type=str, required=False, default="warning",
+                        choices=["debug", "info", "warning", "error"],
+                        help='Console log level. "info" adds one line per resume, "debug" every step (default: warning).')
+    parser.add_argument('--log_file', type=str, required=False, default=None,
+                        help='Also write structured JSON-lines logs to this file.')
+    parser.add_argument('--log_file_level', type=str, required=False, default="info",
+                        choices=["debug", "info", "warning", "error"],
+                        help='Log level for --log_file (default: info).')
+    parser.add_argument('--cache_dir', type=str, required=False, default=".resumeclt_cache",
+                        help='Directory for cached OpenAI parsing results.')
+    parser.add_argument('--no_cache', '--no-cache', action='store_true',
+                        help='Do not read or write the cache.')
+    parser.add_argument('--refresh_cache', '--refresh-cache', action='store_true',
+                        help='Ignore cached results and overwrite them with fresh OpenAI responses.')
+    parser.add_argument('--cache_max_mb', type=float, required=False, default=500,
+                        help='Evict least recently used cache entries above this size, for the text and parse caches '
+                             'together (MB, 0 = unlimited).')
+    parser.add_argument('--cache_max_age_days', type=float, required=False, default=30,
+                        help='Drop cache entries older than this many days (0 = never).')
+    parser.add_argument('--alias_max_entries', type=int, required=False, default=10000,
+                        help='Maximum number of OpenAI school/award match answers remembered across runs.')
 
     return parser.parse_args()
 
@@ -0,0 +1,139 @@
+import errno
+import filecmp
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_MODES = ("copy", "hardlink", "reflink", "symlink", "move")
+
+# What each mode falls back to, in order, when the filesystem refuses it
+# (different device, no link or clone support, permissions)
+FALLBACKS = {
+    "copy": ("copy",),
+    "reflink": ("reflink", "copy"),
+    "hardlink": ("hardlink", "reflink", "copy"),
+    "symlink": ("symlink", "copy"),
+    "move": ("move", "copy_and_remove"),
+}
+
+# Linux ioctl to share a file's extents with another file (btrfs, XFS, bcachefs, overlayfs on those)
+FICLONE = 0x40049409
+
+MAX_COLLISIONS = 1000
+
+# Fallbacks already logged, so a run on a filesystem without links says so once
+_reported = set()
+
+
+class Unsupported(OSError):
+    """The filesystem cannot materialize this way; try the next fallback."""
+
+
+def _candidates(filename):
+    """`filename`, then "name (2).ext", "name (3).ext", ..."""
+    yield filename
+    stem, extension = os.path.splitext(filename)
+    for n in range(2, MAX_COLLISIONS + 1):
+        yield f"{stem} ({n}){extension}"
+
+
+def _same_content(src, dst):
+    try:
+        return os.path.samefile(src, dst) or filecmp.cmp(src, dst, shallow=False)
+    except OSError:
+        return False
+
+
+def _unsupported(e):
+    return e.errno in (errno.EXDEV, errno.EPERM, errno.EACCES, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL,
+                       errno.EMLINK, errno.ENOTTY, errno.ENOSYS)
+
+
+def _write_new(dst, src):
+    """Copy `src` to `dst`, which must not exist."""
+    with open(dst, 'xb') as out:
+        try:
+            with open(src, 'rb') as f:
+                shutil.copyfileobj(f, out, 1 << 20)
+        except BaseException:
+            out.close()
+            os.unlink(dst)
+            raise
+
+
+def _reflink_new(dst, src):
+    try:
+        import fcntl
+    except ImportError:
+        raise Unsupported(errno.ENOTSUP, "reflink needs fcntl")
+    with open(src, 'rb') as f, open(dst, 'xb') as out:
+        try:
+            fcntl.ioctl(out.fileno(), FICLONE, f.fileno())
+        except OSError as e:
+            out.close()
+            os.unlink(dst)
+            raise Unsupported(e.errno, f"reflink: {e.strerror}") if _unsupported(e) else e
+
+
+def _link(method, src, dst):
+    """Create `dst` from `src` with one method; FileExistsError if `dst` is taken."""
+    try:
+        if method == "copy":
+            _write_new(dst, src)
+        elif method == "reflink":
+            _reflink_new(dst, src)
+        elif method == "hardlink":
+            os.link(src, dst)
+        elif method == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+        elif method == "move":
+            # link + unlink rather than os.rename, which would silently replace an existing `dst`
+            os.link(src, dst)
+            os.unlink(src)
+        elif method == "copy_and_remove":
+            _write_new(dst, src)
+            os.unlink(src)
+    except FileExistsError:
+        raise
+    except Unsupported:
+        raise
+    except OSError as e:
+        if method not in ("copy", "copy_and_remove") and _unsupported(e):
+            raise Unsupported(e.errno, f"{method}: {e.strerror}")
+        raise
+
+
+def materialize(src, output_dir, filename, mode="copy"):
+    """
+    Put resume `src` into `output_dir` as `filename` and return the name actually used.
+
+    `mode` is one of OUTPUT_MODES; when the filesystem refuses it (e.g. hard links across
+    devices) the next method in FALLBACKS is tried. Names are taken with exclusive creates,
+    so two resumes that get the same name from concurrent workers never overwrite each
+    other: the second becomes "name (2).ext". A name already holding the same content
+    (e.g. from an earlier run) is reused as is.
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode}")
+    methods = list(FALLBACKS[mode])
+    for candidate in _candidates(filename):
+        dst = os.path.join(output_dir, candidate)
+        while True:
+            try:
+                _link(methods[0], src, dst)
+                return candidate
+            except FileExistsError:
+                if _same_content(src, dst):
+                    if mode == "move":
+                        os.unlink(src)
+                    return candidate
+                break
+            except Unsupported as e:
+                if (mode, methods[1]) not in _reported:
+                    _reported.add((mode, methods[1]))
+                    logger.info("Output mode %s is not available here (%s); falling back to %s.",
+                                mode, e.strerror, methods[1])
+                methods.pop(0)
+    raise FileExistsError(errno.EEXIST, f"No free name for {filename} in {output_dir}")
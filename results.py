@@ -0,0 +1,127 @@
+import csv
+import json
+import os
+import threading
+
+RESULT_FORMATS = ("jsonl", "csv", "parquet")
+
+# Fixed column order for CSV/Parquet; JSONL records carry the same keys
+RESULT_COLUMNS = [
+    "file", "success", "message", "error", "output_file",
+    "name", "education_level", "major", "grad_year",
+    "phd_school", "phd_match_status", "master_school", "master_match_status",
+    "bachelor_school", "bachelor_match_status",
+    "awards", "award_status", "award_matches",
+    "candidate_location", "is_chinese_name", "is_qs50",
+    "parse_source", "parse_confidence", "duplicate_of", "similarity",
+    "timings", "usage",
+]
+
+
+def build_record(file, success, message, details):
+    """Flatten one pipeline outcome (see ResumeCLT.run_pipeline) into a results record."""
+    details = details or {}
+    parsed_info = details.get("parsed_info") or {}
+    record = {column: parsed_info.get(column) for column in RESULT_COLUMNS}
+    record.update({
+        "file": file,
+        "success": success,
+        "message": message,
+        "error": details.get("error"),
+        "output_file": details.get("output_file"),
+        "duplicate_of": details.get("duplicate_of"),
+        "similarity": details.get("similarity"),
+        "timings": details.get("timings"),
+        "usage": details.get("usage"),
+    })
+    return record
+
+
+def _flat(value):
+    """Nested values (awards, award matches, timings, usage) become JSON strings in CSV/Parquet."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class ResultsSink:
+    """
+    Streams one record per resume to a JSONL, CSV or Parquet file.
+    Records are buffered and written every `flush_every` records (and on close), so
+    downstream tools can pick up results without parsing the generated filenames.
+    Parquet needs pyarrow; each flush becomes one row group.
+    """
+
+    def __init__(self, path, fmt="jsonl", append=False, flush_every=50):
+        if fmt not in RESULT_FORMATS:
+            raise ValueError(f"Unknown results format '{fmt}' (expected one of {', '.join(RESULT_FORMATS)})")
+        self.path = path
+        self.fmt = fmt
+        self.flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._writer = None
+
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            self._schema = pa.schema([(column, pa.bool_() if column == "success" else pa.string())
+                                      for column in RESULT_COLUMNS])
+            # Parquet files cannot be appended to, so every run writes a new file
+            self._writer = pq.ParquetWriter(path, self._schema)
+            self._file = None
+        else:
+            write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+            self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+            if fmt == "csv":
+                self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+                if write_header:
+                    self._writer.writeheader()
+
+    def write(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        records, self._buffer = self._buffer, []
+        if self.fmt == "jsonl":
+            self._file.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+            self._file.flush()
+        elif self.fmt == "csv":
+            self._writer.writerows({k: _flat(v) for k, v in r.items()} for r in records)
+            self._file.flush()
+        else:
+            columns = {
+                column: [r.get(column) if column == "success" else
+                         (None if r.get(column) is None else str(_flat(r.get(column))))
+                         for r in records]
+                for column in RESULT_COLUMNS
+            }
+            self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self.fmt == "parquet":
+                self._writer.close()
+            else:
+                self._file.close()
+
+
+def open_results_sink(args):
+    """The ResultsSink configured by --results_format/--results_file, or None if disabled."""
+    if args.results_format == "none":
+        return None
+    path = args.results_file or os.path.join(args.output_dir, f"results.{args.results_format}")
+    # In --watch mode files arrive one by one, so write each record as soon as it is ready
+    return ResultsSink(path, args.results_format, append=args.resume and args.results_format != "parquet",
+                       flush_every=1 if args.watch else 50)
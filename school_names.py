@@ -0,0 +1,214 @@
+import re
+import unicodedata
+
+# School name normalization shared by the reference lists and the parsed resumes, so
+# spellings of the same school land on the same lookup key before any OpenAI call:
+#   清華大學 -> 清华大学, "Tsinghua University" / "THU" -> 清华大学,
+#   "约翰斯·霍普金斯大学" -> 约翰霍普金斯大学, "The University of Hong Kong" -> 香港大学.
+# Keys are folded (NFKC, lowercase, Traditional -> Simplified, no spaces or punctuation)
+# and then mapped through the alias table. Bump NORMALIZATION_VERSION whenever the
+# tables change, so compiled reference tables are rebuilt.
+NORMALIZATION_VERSION = "2"
+
+# Traditional -> Simplified characters that occur in school names. With the optional
+# opencc package installed, its full t2s conversion is used instead.
+TRADITIONAL_TO_SIMPLIFIED = str.maketrans(
+    "亞來倫傳儲內凱劍協國園圖團奧學寧審對屬島師廈廣復徹愛慶會東業橋檳溫漢濟濱瀋灣烏爾猶瑪產盧磯礦範約納紐經維"
+    "羅聖聯臺與茲華萊萬葉薩藝蘇蘭術視覺計設語諸諾謝財貿賓質農連達遜郵鄭醫鐵長門開關陸陽雙電靈韓項頓館馬魯麗麥"
+    "齊資訊網絡統數據機構動熱氣發體貴雲遼陝甘肅贛閩粵瓊滬龍區縣鄉實驗專職選測繪輕紡織鋼礎藥衛紀書處總銀行運進"
+    "邊遠過環廳際僑黃楊劉陳張趙孫吳鍾蕭許馮蔣錢湯龔嚴譚顧鄧歐蒙寶彎夠蓮聲樂劇畫廠鳳鵬鶴鷹傑偉麼為從時間問題類"
+    "風飛讀寫試認證識說聽見論議維興舉義賴",
+    "亚来伦传储内凯剑协国园图团奥学宁审对属岛师厦广复彻爱庆会东业桥槟温汉济滨沈湾乌尔犹玛产卢矶矿范约纳纽经维"
+    "罗圣联台与兹华莱万叶萨艺苏兰术视觉计设语诸诺谢财贸宾质农连达逊邮郑医铁长门开关陆阳双电灵韩项顿馆马鲁丽麦"
+    "齐资讯网络统数据机构动热气发体贵云辽陕甘肃赣闽粤琼沪龙区县乡实验专职选测绘轻纺织钢础药卫纪书处总银行运进"
+    "边远过环厅际侨黄杨刘陈张赵孙吴钟萧许冯蒋钱汤龚严谭顾邓欧蒙宝弯够莲声乐剧画厂凤鹏鹤鹰杰伟么为从时间问题类"
+    "风飞读写试认证识说听见论议维兴举义赖",
+)
+
+# Alternative names -> the name used in the reference lists. Keys and values are folded
+# when the table is built, so spacing, case and punctuation do not matter here.
+# Abbreviations and short forms that name several schools (NTU, SCU, HNU, 华工, 南大, ...)
+# are left out or only listed with a disambiguating suffix: a wrong alias would be a
+# silent false match, while a missing one is only left to the OpenAI matcher.
+ALIASES = {
+    # Mainland China
+    "清华大学": ("Tsinghua University", "THU", "Tsinghua", "清华"),
+    "北京大学": ("Peking University", "PKU", "北大"),
+    "复旦大学": ("Fudan University", "FDU", "Fudan", "复旦"),
+    "上海交通大学": ("Shanghai Jiao Tong University", "Shanghai Jiaotong University", "SJTU", "上海交大", "上交"),
+    "浙江大学": ("Zhejiang University", "ZJU", "浙大"),
+    "南京大学": ("Nanjing University", "NJU"),
+    "哈尔滨工业大学": ("Harbin Institute of Technology", "HIT", "哈工大"),
+    "西安交通大学": ("Xi'an Jiaotong University", "Xian Jiaotong University", "XJTU", "西安交大", "西交"),
+    "中国科学技术大学": ("University of Science and Technology of China", "USTC", "中国科大", "中科大"),
+    "华中科技大学": ("Huazhong University of Science and Technology", "HUST", "华科", "华中科大"),
+    "武汉大学": ("Wuhan University", "WHU", "武大"),
+    "南开大学": ("Nankai University", "NKU"),
+    "厦门大学": ("Xiamen University", "XMU", "厦大"),
+    "天津大学": ("Tianjin University",),
+    "北京航空航天大学": ("Beihang University", "Beijing University of Aeronautics and Astronautics", "BUAA", "北航"),
+    "东南大学": ("Southeast University", "SEU"),
+    "国防科技大学": ("National University of Defense Technology", "NUDT", "国防科大"),
+    "中国人民大学": ("Renmin University of China", "RUC", "人大"),
+    "同济大学": ("Tongji University",),
+    "北京理工大学": ("Beijing Institute of Technology", "北理工"),
+    "大连理工大学": ("Dalian University of Technology", "大工"),
+    "山东大学": ("Shandong University",),
+    "华南理工大学": ("South China University of Technology", "SCUT"),
+    "吉林大学": ("Jilin University",),
+    "重庆大学": ("Chongqing University",),
+    "中南大学": ("Central South University",),
+    "四川大学": ("Sichuan University", "川大"),
+    "西北工业大学": ("Northwestern Polytechnical University", "NWPU", "西工大"),
+    "电子科技大学": ("University of Electronic Science and Technology of China", "UESTC", "电子科大"),
+    "湖南大学": ("Hunan University",),
+    "华东师范大学": ("East China Normal University", "ECNU", "华东师大", "华师大"),
+    "中山大学": ("Sun Yat-sen University", "SYSU"),
+    "北京师范大学": ("Beijing Normal University", "BNU", "北师大"),
+    "兰州大学": ("Lanzhou University", "LZU", "兰大"),
+    "中国科学院大学": ("University of Chinese Academy of Sciences", "UCAS", "国科大"),
+    "南京航空航天大学": ("Nanjing University of Aeronautics and Astronautics", "NUAA", "南航"),
+    "北京交通大学": ("Beijing Jiaotong University", "BJTU", "北交大"),
+    "哈尔滨工程大学": ("Harbin Engineering University", "哈工程"),
+    "西安电子科技大学": ("Xidian University", "XDU", "西电"),
+    "南方科技大学": ("Southern University of Science and Technology", "SUSTech", "南科大"),
+    "华东理工大学": ("East China University of Science and Technology", "ECUST"),
+    "南京理工大学": ("Nanjing University of Science and Technology", "NJUST", "南理工"),
+    "西南交通大学": ("Southwest Jiaotong University", "SWJTU"),
+    "北京科技大学": ("University of Science and Technology Beijing", "USTB", "北科大"),
+    "北京邮电大学": ("Beijing University of Posts and Telecommunications", "BUPT", "北邮"),
+    "上海大学": ("Shanghai University",),
+    "暨南大学": ("Jinan University",),
+    "合肥工业大学": ("Hefei University of Technology", "HFUT"),
+    "深圳大学": ("Shenzhen University",),
+    "上海科技大学": ("ShanghaiTech University", "ShanghaiTech"),
+    "北京协和医学院": ("Peking Union Medical College", "PUMC"),
+    "澳门大学": ("University of Macau", "UM Macau"),
+    # Hong Kong and Taiwan
+    "香港大学": ("University of Hong Kong", "HKU", "港大"),
+    "香港科技大学": ("Hong Kong University of Science and Technology", "HKUST", "港科大"),
+    "香港中文大学": ("Chinese University of Hong Kong", "CUHK", "港中文"),
+    "香港城市大学": ("City University of Hong Kong", "CityU", "CityU HK", "港城大"),
+    "香港理工大学": ("Hong Kong Polytechnic University", "PolyU", "港理工"),
+    "国立台湾大学": ("National Taiwan University", "NTU Taiwan", "台湾大学", "台大"),
+    "国立清华大学": ("National Tsing Hua University", "NTHU"),
+    "国立阳明交通大学": ("National Yang Ming Chiao Tung University", "NYCU", "National Chiao Tung University", "NCTU"),
+    # Rest of the world (QS top 50 and frequent applicants)
+    "麻省理工学院": ("Massachusetts Institute of Technology", "MIT", "麻省理工"),
+    "牛津大学": ("University of Oxford", "Oxford University", "Oxford"),
+    "剑桥大学": ("University of Cambridge", "Cambridge University", "Cambridge"),
+    "斯坦福大学": ("Stanford University", "Stanford"),
+    "哈佛大学": ("Harvard University", "Harvard"),
+    "加州理工学院": ("California Institute of Technology", "Caltech"),
+    "帝国理工学院": ("Imperial College London", "Imperial College", "伦敦帝国学院", "帝国理工"),
+    "伦敦大学学院": ("University College London", "UCL"),
+    "苏黎世联邦理工学院": ("ETH Zurich", "ETH Zürich", "ETHZ", "Swiss Federal Institute of Technology Zurich"),
+    "芝加哥大学": ("University of Chicago", "UChicago"),
+    "新加坡国立大学": ("National University of Singapore", "NUS"),
+    "南洋理工大学": ("Nanyang Technological University", "NTU Singapore", "新加坡南洋理工大学", "南洋理工"),
+    "宾夕法尼亚大学": ("University of Pennsylvania", "UPenn"),
+    "洛桑联邦理工学院": ("EPFL", "Ecole Polytechnique Federale de Lausanne"),
+    "耶鲁大学": ("Yale University", "Yale"),
+    "爱丁堡大学": ("University of Edinburgh",),
+    "哥伦比亚大学": ("Columbia University",),
+    "普林斯顿大学": ("Princeton University", "Princeton"),
+    "康奈尔大学": ("Cornell University", "Cornell"),
+    "密歇根大学安娜堡分校": ("University of Michigan", "University of Michigan Ann Arbor", "UMich", "密歇根大学"),
+    "东京大学": ("University of Tokyo", "UTokyo"),
+    "约翰霍普金斯大学": ("Johns Hopkins University", "JHU", "约翰斯霍普金斯大学"),
+    "多伦多大学": ("University of Toronto", "UofT", "U of T"),
+    "曼彻斯特大学": ("University of Manchester",),
+    "澳洲国立大学": ("Australian National University", "ANU", "澳大利亚国立大学"),
+    "麦吉尔大学": ("McGill University",),
+    "西北大学（美国）": ("Northwestern University",),
+    "加州大学伯克利分校": ("University of California Berkeley", "UC Berkeley", "Berkeley",
+                       "加利福尼亚大学伯克利分校"),
+    "京都大学": ("Kyoto University",),
+    "伦敦大学国王学院": ("King's College London", "KCL", "伦敦国王学院"),
+    "首尔国立大学": ("Seoul National University",),
+    "墨尔本大学": ("University of Melbourne",),
+    "悉尼大学": ("University of Sydney",),
+    "加州大学洛杉矶分校": ("University of California Los Angeles", "UCLA", "加利福尼亚大学洛杉矶分校"),
+    "KAIST": ("Korea Advanced Institute of Science and Technology", "韩国科学技术院"),
+    "纽约大学": ("New York University", "NYU"),
+    "新南威尔士大学": ("University of New South Wales", "UNSW"),
+    "巴黎文理研究大学": ("PSL University", "Université PSL", "Paris Sciences et Lettres"),
+    "英属哥伦比亚大学": ("University of British Columbia", "UBC"),
+    "昆士兰大学": ("University of Queensland", "UQ"),
+    "加州大学圣地亚哥分校": ("University of California San Diego", "UCSD", "UC San Diego"),
+    "巴黎理工学院": ("Ecole Polytechnique", "Institut Polytechnique de Paris", "巴黎综合理工学院"),
+    "伦敦政治经济学院": ("London School of Economics", "London School of Economics and Political Science", "LSE"),
+    "慕尼黑工业大学": ("Technical University of Munich", "TU Munich", "TUM"),
+    "杜克大学": ("Duke University",),
+    "卡耐基梅隆大学": ("Carnegie Mellon University", "CMU", "卡内基梅隆大学", "卡内基美隆大学"),
+    "代尔夫特理工大学": ("Delft University of Technology", "TU Delft"),
+    "莫纳什大学": ("Monash University",),
+    "布朗大学": ("Brown University",),
+    "华威大学": ("University of Warwick",),
+    "德克萨斯大学奥斯汀分校": ("University of Texas at Austin", "UT Austin"),
+    "伊利诺伊大学厄本那-香槟分校": ("University of Illinois Urbana-Champaign", "University of Illinois at Urbana-Champaign",
+                           "UIUC"),
+    "威斯康辛大学麦迪逊分校": ("University of Wisconsin-Madison", "UW-Madison"),
+    "华盛顿大学": ("University of Washington", "UW Seattle"),
+    "佐治亚理工学院": ("Georgia Institute of Technology", "Georgia Tech"),
+    "瑞典皇家理工学院": ("KTH Royal Institute of Technology", "KTH"),
+    "南加州大学": ("University of Southern California", "USC"),
+    "普渡大学西拉法叶分校": ("Purdue University", "普渡大学"),
+    "德州农工大学": ("Texas A&M University", "TAMU"),
+    "埃默里大学": ("Emory University", "艾茉莉大学"),
+    "莱斯大学": ("Rice University", "赖斯大学"),
+    "弗莱堡大学": ("University of Freiburg", "弗赖堡大学"),
+}
+
+NON_WORD = re.compile(r"[\W_]+")
+LEADING_THE = re.compile(r"^the\s+")
+ABBREVIATED_UNIVERSITY = re.compile(r"\buniv\b\.?")
+
+
+def _opencc_convert():
+    """opencc's Traditional -> Simplified converter, or None if the package is not installed."""
+    try:
+        import opencc
+    except ImportError:
+        return None
+    for config in ("t2s", "t2s.json"):  # the config name differs between opencc packages
+        try:
+            return opencc.OpenCC(config).convert
+        except Exception:
+            continue
+    return None
+
+
+_convert = _opencc_convert()
+
+# Part of the compiled reference table key: tables built with opencc differ from ours
+NORMALIZATION_ID = f"{NORMALIZATION_VERSION}-{'opencc' if _convert else 'builtin'}"
+
+
+def to_simplified(text):
+    return _convert(text) if _convert else text.translate(TRADITIONAL_TO_SIMPLIFIED)
+
+
+def fold(text):
+    """Script, case, whitespace and punctuation folding only (no aliases)."""
+    text = unicodedata.normalize("NFKC", text).strip().lower()
+    text = ABBREVIATED_UNIVERSITY.sub("university", LEADING_THE.sub("", text))
+    return NON_WORD.sub("", to_simplified(text))
+
+
+def _build_alias_table():
+    table = {}
+    for canonical, aliases in ALIASES.items():
+        key = fold(canonical)
+        for alias in aliases:
+            table[fold(alias)] = key
+    return table
+
+
+ALIAS_TABLE = _build_alias_table()
+
+
+def canonical_school(name):
+    """The lookup key for a school name: folded, then resolved through ALIAS_TABLE."""
+    key = fold(name)
+    return ALIAS_TABLE.get(key, key)
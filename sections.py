@@ -0,0 +1,125 @@
+import re
+from collections import Counter
+
+# Section heading keywords (lowercase). A line counts as a heading when, stripped of
+# numbering, decoration and a trailing colon, it starts with one of these and what
+# follows is a few words without digits or punctuation ("Honors & Awards", not
+# "Languages: English, Chinese").
+SECTION_KEYWORDS = {
+    "education": ("education", "academic background", "educational background", "教育背景", "教育经历", "学历"),
+    "awards": ("awards", "honors", "honours", "achievements", "competitions", "scholarships",
+               "获奖", "奖项", "荣誉", "竞赛"),
+    "experience": ("experience", "work experience", "professional experience", "research experience", "employment",
+                   "internship", "工作经历", "实习经历", "工作经验", "实践经历", "科研经历"),
+    "publications": ("publications", "papers", "selected publications", "发表论文", "论文", "学术成果"),
+    "projects": ("projects", "project experience", "项目经历", "项目经验"),
+    "skills": ("skills", "technical skills", "languages", "certifications", "技能", "专业技能", "语言能力", "证书"),
+    "other": ("references", "interests", "hobbies", "activities", "self-evaluation", "summary", "objective",
+              "自我评价", "兴趣爱好", "个人评价", "求职意向"),
+}
+
+# Sections the parsing prompt needs, in the order they get a share of the size cap.
+# "header" is everything before the first heading (name, contact details, location).
+# Publications and projects are kept last: top-venue papers and competition projects
+# can feed the awards field.
+KEPT_SECTIONS = ("header", "education", "awards", "experience", "publications", "projects")
+
+MAX_HEADING_CHARS = 40
+PAGE_NUMBER = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|-?\s*\d{1,2}\s*-?|\d{1,2}\s*/\s*\d{1,2}|第\s*\d+\s*页.*)$",
+                         re.IGNORECASE)
+HEADING_SUFFIX = re.compile(r"^[^\d,.;:，。；：]{0,15}$")
+HEADING_DECORATION = re.compile(r"^[\s\d.、一二三四五六七八九十()（）#*•■□◆●\-–—|]+|[\s:：|]+$")
+
+
+def clean_text(text):
+    """
+    Collapse runs of spaces, drop blank lines, page numbers and consecutive duplicate lines,
+    and keep only the first copy of short lines repeated on several pages (headers/footers).
+    """
+    lines = [re.sub(r"[ \t　\xa0]+", " ", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not PAGE_NUMBER.match(line)]
+    repeated = {line for line, n in Counter(lines).items() if n >= 3 and len(line) <= 60 and not heading_of(line)}
+    seen = set()
+    cleaned = []
+    for line in lines:
+        if line in repeated:
+            if line in seen:
+                continue
+            seen.add(line)
+        if cleaned and cleaned[-1] == line:
+            continue
+        cleaned.append(line)
+    return cleaned
+
+
+def heading_of(line):
+    """The section name if `line` looks like a section heading, else None."""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    key = HEADING_DECORATION.sub("", line).lower()
+    if not key:
+        return None
+    for section, keywords in SECTION_KEYWORDS.items():
+        for keyword in keywords:
+            if key.startswith(keyword) and HEADING_SUFFIX.match(key[len(keyword):]):
+                return section
+    return None
+
+
+def segment(lines):
+    """Split cleaned lines into [(section name, lines)] in document order, headings included."""
+    sections = [("header", [])]
+    for line in lines:
+        section = heading_of(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def _truncate(lines, budget):
+    """
+    Leading lines of `lines` totalling at most `budget` characters (newlines included).
+    The first line that does not fit is cut to the remaining budget rather than dropped,
+    so a resume pasted as one long line still keeps its beginning.
+    """
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > budget:
+            if budget - used > 1:
+                kept.append(line[:budget - used - 1])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def trim_resume_text(text, max_chars=6000):
+    """
+    Deterministically shrink resume text before it is sent for parsing: clean it, keep
+    only the sections the parsed fields come from (KEPT_SECTIONS), and cap the result at
+    `max_chars` characters (0 = no cap), giving earlier KEPT_SECTIONS first claim on the
+    budget. Text without recognizable headings or without an education section is only
+    cleaned and capped, so nothing the parser relies on is dropped by a bad segmentation.
+    """
+    lines = clean_text(text)
+    sections = segment(lines)
+    names = {name for name, _ in sections}
+    if "education" not in names:
+        sections = [("header", lines)]
+    else:
+        sections = [(name, body) for name, body in sections if name in KEPT_SECTIONS]
+
+    if max_chars:
+        remaining = max_chars
+        budgets = {}
+        for priority in KEPT_SECTIONS:
+            for i, (name, body) in enumerate(sections):
+                if name == priority:
+                    kept = _truncate(body, remaining)
+                    budgets[i] = kept
+                    remaining -= sum(len(line) + 1 for line in kept)
+        sections = [(name, budgets.get(i, [])) for i, (name, _) in enumerate(sections)]
+
+    return "\n".join(line for _, body in sections for line in body)
@@ -0,0 +1,21 @@
+from cache import AliasStore
+
+
+def test_alias_store_keeps_the_most_recent_entries(tmp_path):
+    path = str(tmp_path / "aliases.json")
+    store = AliasStore(path, "lists-v1", max_entries=3)
+    for i in range(5):
+        store.put(f"school {i}", f"answer {i}")
+    store.save()
+    assert AliasStore(path, "lists-v1", max_entries=3)._entries == {f"school {i}": f"answer {i}" for i in (2, 3, 4)}
+    assert list(AliasStore(path, "lists-v1", max_entries=2)._entries) == ["school 3", "school 4"]
+    assert len(AliasStore(path, "lists-v1", max_entries=0)) == 0
+    assert len(AliasStore(path, "lists-v2", max_entries=3)) == 0
+
+
+def test_alias_store_ignores_malformed_entries(tmp_path):
+    path = tmp_path / "aliases.json"
+    path.write_text('{"fingerprint": "lists-v1", "entries": [["thu", "清华大学"], "junk", [1, 2], ["pku"]]}',
+                    encoding="utf-8")
+    store = AliasStore(str(path), "lists-v1")
+    assert store.get("thu") == "清华大学" and len(store) == 1
@@ -0,0 +1,95 @@
+import random
+
+from dedup import DuplicateIndex, DuplicateResolver, minhash, similarity
+
+
+def _text(seed, words=2000):
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+                  for _ in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def _finish(file, original_outcome, details):
+    success, original_details = original_outcome
+    if not success:
+        return False, f"duplicate of failed {details['duplicate_of']}", dict(details, error=original_details["error"])
+    return True, "duplicate done", dict(details, output_file=original_details["output_file"])
+
+
+def test_near_duplicate_found_by_signature():
+    text = _text(1)
+    edited = text[:5000] + " one more line " + text[5000:]
+    assert similarity(minhash(text), minhash(edited)) >= 0.9
+    assert similarity(minhash(text), minhash(_text(2))) < 0.5
+    assert minhash("too short") is None
+
+
+def test_precomputed_signature_is_used():
+    index = DuplicateIndex(threshold=0.9)
+    text = _text(3)
+    index.add_signature("a.pdf", minhash(text))
+    assert index.claim_text("a.pdf", text) is None
+    original, score = index.claim_text("b.pdf", text)
+    assert original == "a.pdf" and score == 1.0
+
+
+def test_duplicate_waits_for_original():
+    reported = []
+    resolver = DuplicateResolver(lambda *outcome: reported.append(outcome), _finish)
+    resolver("b.pdf", None, None, {"duplicate_of": "a.pdf"})
+    assert reported == []
+    resolver("a.pdf", True, "done", {"output_file": "A.pdf"})
+    assert [(file, success) for file, success, _, _ in reported] == [("a.pdf", True), ("b.pdf", True)]
+    assert reported[1][3]["output_file"] == "A.pdf"
+
+
+def test_duplicate_of_failed_original_is_finished():
+    reported = []
+    resolver = DuplicateResolver(lambda *outcome: reported.append(outcome), _finish)
+    resolver("b.pdf", None, None, {"duplicate_of": "a.pdf"})
+    resolver("a.pdf", False, "error", {"error": "Error extracting text: boom"})
+    assert [(file, success) for file, success, _, _ in reported] == [("a.pdf", False), ("b.pdf", False)]
+    assert reported[1][3]["error"] == "Error extracting text: boom"
+
+
+def test_duplicates_of_unreported_original_are_finished_on_close():
+    reported = []
+    resolver = DuplicateResolver(lambda *outcome: reported.append(outcome), _finish)
+    resolver("b.pdf", None, None, {"duplicate_of": "a.pdf"})
+    resolver("c.pdf", None, None, {"duplicate_of": "b.pdf"})
+    resolver.close()
+    assert sorted((file, success) for file, success, _, _ in reported) == [("b.pdf", False), ("c.pdf", False)]
+    assert resolver.waiting == {}
+
+
+def test_failing_finish_is_reported():
+    reported = []
+
+    def finish(file, original_outcome, details):
+        raise OSError("disk full")
+
+    resolver = DuplicateResolver(lambda *outcome: reported.append(outcome), finish)
+    resolver("a.pdf", True, "done", {"output_file": "A.pdf"})
+    resolver("b.pdf", None, None, {"duplicate_of": "a.pdf"})
+    assert reported[1][1] is False and "disk full" in reported[1][3]["error"]
+
+
+def test_replaced_file_is_claimed_again():
+    index = DuplicateIndex(threshold=0.9)
+    text = _text(4)
+    assert index.claim_file("a.pdf", "d1") is None
+    assert index.claim_text("a.pdf", text) is None
+    assert index.claim_file("b.pdf", "d1") == "a.pdf"
+    assert index.claim_text("b.pdf", text) == ("a.pdf", 1.0)
+
+    # b.pdf replaced with an unrelated resume: no longer a duplicate
+    assert index.claim_file("b.pdf", "d2") is None
+    assert index.claim_text("b.pdf", _text(5)) is None
+    assert "b.pdf" not in index.duplicates and "b.pdf" not in index.exact
+
+    # a.pdf replaced: its old digest and signature no longer match
+    assert index.claim_file("a.pdf", "d3") is None
+    assert index.claim_text("a.pdf", _text(6)) is None
+    assert index.claim_file("c.pdf", "d1") is None
+    assert index.claim_text("c.pdf", text) is None
@@ -0,0 +1,62 @@
+from fastpath import FastPathExtractor
+from matcher import ReferenceData, ReferenceIndex
+
+MIN_CONFIDENCE = 0.9  # default --fast_path_min_confidence
+
+
+def _extractor():
+    return FastPathExtractor(ReferenceData(
+        schools=ReferenceIndex(["清华大学", "北京大学", "University of Toronto"], school_names=True),
+        awards=ReferenceIndex(["ICPC: International Collegiate Programming Contest"], lowercase=True),
+        awards2=ReferenceIndex(["CVPR: Computer Vision and Pattern Recognition"], lowercase=True),
+        qs50=ReferenceIndex(["University of Toronto"], school_names=True),
+    ))
+
+
+def _resume(education, awards=None):
+    lines = ["Emily Carter", "Toronto, Canada | emily@example.com", "Education"] + education
+    if awards is not None:
+        lines += ["Awards"] + awards
+    return "\n".join(lines + ["Experience", "Software engineer at Example Corp, 2020 - 2022"])
+
+
+def test_complete_resume_takes_fast_path():
+    parsed, confidence = _extractor().extract(
+        _resume(["M.S. University of Toronto 2018 - 2020", "专业：计算机科学"], ["ICPC World Finals 2019"]))
+    assert parsed["major"] == "计算机科学"
+    assert confidence >= MIN_CONFIDENCE
+
+
+def test_missing_major_is_not_confident():
+    parsed, confidence = _extractor().extract(
+        _resume(["M.S. University of Toronto 2018 - 2020"], ["ICPC World Finals 2019"]))
+    assert parsed["major"] == ""
+    assert confidence < MIN_CONFIDENCE
+
+
+def test_missing_awards_section_is_not_confident():
+    parsed, confidence = _extractor().extract(_resume(["M.S. University of Toronto 2018 - 2020", "专业：计算机科学"]))
+    assert parsed["awards"] == []
+    assert confidence < MIN_CONFIDENCE
+
+
+def test_postdoc_is_not_a_phd():
+    parsed, _ = _extractor().extract(_resume(
+        ["博士后 清华大学 2021 - 2023", "硕士 北京大学 计算机科学 2016 - 2019"], ["ICPC World Finals 2019"]))
+    assert parsed["education_level"] == "硕士"
+    assert parsed["phd_school"] == "NA"
+    assert parsed["master_school"] == "北京大学"
+
+
+def test_ongoing_needs_a_whole_word():
+    assert FastPathExtractor._grad_year("本科", ["Tsinghua University, B.S. Knowledge Engineering, 2019"]) == 2019
+    assert FastPathExtractor._grad_year("硕士", ["Peking University, graduated 2021 (concurrent enrollment)"]) == 2021
+    assert FastPathExtractor._grad_year("本科", ["Tsinghua University, B.S., 2021 - present"]) == 2025
+
+
+def test_chinese_name_by_surname_position():
+    assert FastPathExtractor.is_chinese_name("张伟")
+    assert FastPathExtractor.is_chinese_name("Zhang Wei")
+    assert FastPathExtractor.is_chinese_name("Xiaoming LI")
+    assert not FastPathExtractor.is_chinese_name("Michael Long")
+    assert not FastPathExtractor.is_chinese_name("Emily Carter")
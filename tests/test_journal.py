@@ -0,0 +1,34 @@
+import json
+import os
+import threading
+
+from journal import load_journal, watch_resume_files
+
+
+def _write(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_load_journal_skips_lines_that_are_not_records(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text("\n".join([json.dumps({"file": "a.pdf", "success": True}), json.dumps({"success": True}),
+                               "[1, 2]", '{"file": "b.pd']), encoding='utf-8')
+    assert list(load_journal(str(path))) == ["a.pdf"]
+
+
+def test_watch_reports_replaced_and_recreated_files(tmp_path):
+    resume = os.path.join(tmp_path, "a.pdf")
+    _write(resume, "first")
+    stop = threading.Event()
+    batches = watch_resume_files(str(tmp_path), interval=0.01, settle_seconds=0, stop=stop)
+
+    assert next(batches) == [resume]
+    _write(resume, "second version")  # replaced in place: new size
+    assert next(batches) == [resume]
+    os.remove(resume)
+    _write(os.path.join(tmp_path, "b.pdf"), "other")
+    assert next(batches) == [os.path.join(tmp_path, "b.pdf")]
+    _write(resume, "second version")  # same signature as before it was removed, but new again
+    assert next(batches) == [resume]
+    stop.set()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+openai = pytest.importorskip("openai")
+
+from bench.stub_openai import StubOpenAIServer  # noqa: E402
+from llm_client import LLMClient, _RateLimiter  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture
+def stub(request):
+    server = StubOpenAIServer(errors=getattr(request, "param", ())).start()
+    yield server
+    server.stop()
+
+
+def _client(stub, **settings):
+    return LLMClient(api_key="test", base_url=stub.base_url, backoff_base=0.01, backoff_max=0.05, **settings)
+
+
+@pytest.mark.parametrize("stub", [(429, 500)], indirect=True)
+def test_retries_throttling_and_server_errors(stub):
+    client = _client(stub)
+    try:
+        completion = client.chat(MESSAGES, "stub")
+    finally:
+        client.close()
+    assert completion.retries == 2
+    assert (client.requests, client.retries, client.failures) == (1, 2, 0)
+    assert stub.requests["error"] == 2 and client.prompt_tokens > 0
+
+
+@pytest.mark.parametrize("stub", [(500, 500, 500)], indirect=True)
+def test_gives_up_after_max_retries(stub):
+    client = _client(stub, max_retries=1)
+    try:
+        with pytest.raises(openai.InternalServerError) as raised:
+            client.chat(MESSAGES, "stub")
+    finally:
+        client.close()
+    assert raised.value.retries == 1
+    assert (client.requests, client.retries, client.failures) == (1, 1, 1)
+    assert stub.requests == {"error": 2}
+
+
+def test_concurrent_calls_share_the_client(stub):
+    stub.latency = 0.2
+    client = _client(stub, max_in_flight=4)
+    try:
+        start = time.monotonic()
+        client._run(asyncio.gather(*(client.achat(MESSAGES, "stub") for _ in range(4))))
+        elapsed = time.monotonic() - start
+    finally:
+        client.close()
+    assert client.requests == 4
+    assert elapsed < 0.6  # the four requests ran at the same time, not one after another
+
+
+def test_rate_limiter_waits_for_the_budget():
+    async def acquire_twice():
+        limiter = _RateLimiter(per_minute=600)  # 10 units a second, starting full
+        await limiter.acquire(600)
+        start = time.monotonic()
+        await limiter.acquire(5)
+        return time.monotonic() - start
+
+    assert 0.4 < asyncio.run(acquire_twice()) < 1.0
@@ -0,0 +1,28 @@
+import json
+import logging
+import multiprocessing
+
+from logs import log_context, setup_logging
+
+
+def _log_large_records(log_file, worker):
+    setup_logging("error", log_file=log_file, log_file_level="debug")
+    for i in range(10):
+        with log_context(i, f"resume-{worker}.pdf"):
+            logging.getLogger("test").debug("%s", str(worker) * 200000)
+    logging.shutdown()
+
+
+def test_large_records_from_several_processes_stay_whole(tmp_path):
+    log_file = str(tmp_path / "run.jsonl")
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_log_large_records, args=(log_file, worker)) for worker in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    with open(log_file, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert len(entries) == 30
+    for entry in entries:
+        assert entry["message"] == entry["file"][7] * 200000
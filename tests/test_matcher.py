@@ -0,0 +1,88 @@
+import os
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+from matcher import ReferenceIndex
+from school_names import canonical_school
+
+THRESHOLDS = (0.9, 0.8, 0.6)  # the pipeline matches at 0.9; lower ones exercise more candidates
+CJK_CHARS = "北京清华复旦浙江南开天津武汉华中科技西安交通上海同济东南四川重庆山东吉林哈尔滨工业中山厦门兰州电子航空航天理工师范農業醫學"
+EN_WORDS = ["North", "South", "East", "West", "Central", "State", "Technical", "National", "Pacific", "Royal",
+            "Lake", "River", "Institute", "College", "Polytechnic", "Science", "ICPC", "ACM", "Gold", "Medal"]
+NORMALIZE = {
+    "plain": lambda s: s.strip(),
+    "lowercase": lambda s: s.strip().lower(),
+    "school_names": canonical_school,
+}
+
+
+def _entry(rng):
+    if rng.random() < 0.6:
+        return "".join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 6))) + rng.choice(["大学", "学院", "大學"])
+    words = " ".join(rng.sample(EN_WORDS, rng.randint(1, 3)))
+    return rng.choice(["University of ", "", " "]) + words + rng.choice([" University", "", " AWARD "])
+
+
+def _mutate(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.random()
+        if op < 0.35 and chars:
+            del chars[rng.randrange(len(chars))]
+        elif op < 0.7:
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(CJK_CHARS + "aeiouAEIOU "))
+        elif chars:
+            chars[rng.randrange(len(chars))] = rng.choice(CJK_CHARS + "aeiou")
+    return "".join(chars)
+
+
+def _linear_best_match(key, entries, entry_keys):
+    """Score every entry with SequenceMatcher and keep the first strictly-best one."""
+    best_entry, best_ratio = None, 0.0
+    for entry, entry_key in zip(entries, entry_keys):
+        ratio = SequenceMatcher(None, key, entry_key).ratio()
+        if ratio > best_ratio:
+            best_entry, best_ratio = entry, ratio
+    return best_entry, best_ratio
+
+
+@pytest.mark.parametrize("mode", sorted(NORMALIZE))
+def test_lookups_match_the_linear_scan(mode):
+    rng = random.Random(f"matcher-{mode}")
+    entries = [_entry(rng) for _ in range(300)] + ["", "清华大学", "Tsinghua University"]
+    index = ReferenceIndex(entries, lowercase=mode == "lowercase", school_names=mode == "school_names")
+    normalize = NORMALIZE[mode]
+    entry_keys = [normalize(entry) for entry in entries]
+    queries = [_mutate(rng, rng.choice(entries)) if rng.random() < 0.8 else _entry(rng) for _ in range(100)]
+    queries += ["", "  清華大學 ", "THU", "tsinghua university"]
+    for query in queries:
+        key = normalize(query)
+        assert index.contains(query) == (key in entry_keys), query
+        best = _linear_best_match(key, entries, entry_keys)
+        for threshold in THRESHOLDS:
+            expected = best if best[1] >= threshold else (None, 0.0)
+            assert index.best_match(query, threshold) == expected, (query, threshold)
+            assert index.fuzzy_contains(query, threshold) == (expected[0] is not None), (query, threshold)
+
+
+
+def test_compiled_tables_of_an_edited_list_replace_the_old_ones(tmp_path):
+    compiled_dir = tmp_path / "references"
+    awards = tmp_path / "awards.txt"
+    schools = tmp_path / "schools.txt"
+    schools.write_text("清华大学\n北京大学\n", encoding="utf-8")
+    school_index = ReferenceIndex.from_file(str(schools), compiled_dir=str(compiled_dir), school_names=True)
+
+    awards.write_text("ICPC World Finals\nACM Gold Medal\n", encoding="utf-8")
+    first = ReferenceIndex.from_file(str(awards), lowercase=True, compiled_dir=str(compiled_dir))
+    reopened = ReferenceIndex.from_file(str(awards), lowercase=True, compiled_dir=str(compiled_dir))
+    assert reopened.path == first.path and reopened.entries == first.entries
+    assert len(os.listdir(compiled_dir)) == 2
+
+    awards.write_text("ICPC World Finals\nACM Gold Medal\nNOI Gold Medal\n", encoding="utf-8")
+    edited = ReferenceIndex.from_file(str(awards), lowercase=True, compiled_dir=str(compiled_dir))
+    assert edited.contains("noi gold medal")
+    assert not os.path.exists(first.path)
+    assert sorted(os.listdir(compiled_dir)) == sorted(os.path.basename(index.path) for index in (school_index, edited))
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from school_names import ALIAS_TABLE, canonical_school, fold
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _is_simplified(char):
+    # GB2312 has the Simplified characters; the Traditional-only forms are not in it
+    try:
+        char.encode('gb2312')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _script_pairs():
+    """(simplified, traditional) spellings listed next to each other in test_school_list.txt."""
+    with open(os.path.join(REPO_DIR, "test_school_list.txt"), 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return [(a, b) for a, b in zip(lines, lines[1:])
+            if len(a) == len(b) and a != b and all(map(_is_simplified, a))
+            and all(x == y or not _is_simplified(y) for x, y in zip(a, b))]
+
+
+def test_school_list_has_script_pairs():
+    assert len(_script_pairs()) > 300
+
+
+@pytest.mark.parametrize("simplified, traditional", _script_pairs())
+def test_traditional_spelling_folds_to_simplified(simplified, traditional):
+    assert canonical_school(traditional) == canonical_school(simplified)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Tsinghua University", "清华大学"),
+    ("PKU", "北京大学"),
+    ("The University of Hong Kong", "香港大学"),
+    ("约翰斯·霍普金斯大学", "约翰霍普金斯大学"),
+    ("弗賴堡大學", "弗莱堡大学"),
+    ("韓國科學技術院", "KAIST"),
+    ("NTU Singapore", "南洋理工大学"),
+])
+def test_aliases(name, expected):
+    assert canonical_school(name) == fold(expected)
+
+
+@pytest.mark.parametrize("abbreviation", ["NTU", "SCU", "HNU", "华工", "南大"])
+def test_ambiguous_abbreviations_are_not_aliased(abbreviation):
+    assert fold(abbreviation) not in ALIAS_TABLE
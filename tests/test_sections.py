@@ -0,0 +1,17 @@
+from sections import trim_resume_text
+
+
+def test_long_single_line_is_cut_not_dropped():
+    text = "Emily Carter, University of Toronto, M.S. 2020, " * 500
+    trimmed = trim_resume_text(text, max_chars=1000)
+    assert trimmed
+    assert len(trimmed) < 1000
+    assert trimmed.startswith("Emily Carter, University of Toronto")
+
+
+def test_budget_is_shared_by_whole_lines_first():
+    text = "\n".join(["Emily Carter", "Education", "M.S. University of Toronto 2018 - 2020", "Experience"]
+                     + ["Built data pipelines " * 20] * 10)
+    trimmed = trim_resume_text(text, max_chars=300)
+    assert len(trimmed) <= 300
+    assert trimmed.startswith("Emily Carter\nEducation\nM.S. University of Toronto 2018 - 2020")
@@ -1,45 +1,52 @@
 import os
 import json
+import logging
 import re
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import fitz  # PyMuPDF
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
-from openai import OpenAI
 from docx import Document
 from docx2txt import process as docx2txt_process
 from PIL import Image
 from dotenv import load_dotenv
-import platform
+import shutil
 import subprocess
+import tempfile
+from cache import Caches, file_digest, make_key
+from llm_client import chat_completion
+import metrics
+from sections import trim_resume_text
+from fastpath import FastPathExtractor
+from doc_reader import read_doc_text
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-from difflib import SequenceMatcher
+load_dotenv()
 
-def exact_match(school_name, target_list):
-    """Check for exact string match ignoring leading/trailing whitespace."""
-    school_stripped = school_name.strip()
-    return any(school_stripped == t.strip() for t in target_list)
+def exact_match(school_name, target_index):
+    """Check for an exact match after school name normalization (script, punctuation, aliases)."""
+    return target_index.contains(school_name)
 
-def fuzzy_match(school_name, target_list, threshold=0.9):
+def fuzzy_match(school_name, target_index, threshold=0.9):
     """
     Use difflib to see if there's a sufficiently close match (e.g. >= 0.9).
     Return True if we find a match above threshold, else False.
     """
-    for t in target_list:
-        ratio = SequenceMatcher(None, school_name.strip(), t.strip()).ratio()
-        if ratio >= threshold:
-            return True
-    return False
+    return target_index.fuzzy_contains(school_name, threshold)
 
-def check_local_school_matches(parsed_info, target_school_list, fuzzy_threshold=0.9):
+def check_local_school_matches(parsed_info, target_index, fuzzy_threshold=0.9):
     """
     Check local matches for PhD, Master's, Bachelor's schools.
     1. If exact match or fuzzy match >= threshold, mark 'Match'.
     2. Otherwise, mark 'Not Match'.
     Returns a list of degrees that are still 'Not Match' and need OpenAI semantic matching.
     """
-    print("[DEBUG] Performing local (exact/fuzzy) school matching...")
+    logger.debug("Performing local (exact/fuzzy) school matching...")
 
     not_matched_degrees = []
 
@@ -49,32 +56,100 @@ def check_local_school_matches(parsed_info, target_school_list, fuzzy_threshold=
 
         school_name = parsed_info.get(school_key, 'NA')
         if school_name == 'NA':
-            print(f"[DEBUG] {degree.capitalize()} school is 'NA' (not provided). Marking as 'Not Match'.")
+            logger.debug("%s school is 'NA' (not provided). Marking as 'Not Match'.", degree.capitalize())
             parsed_info[match_status_key] = 'Not Match'
             continue
 
-        print(f"[DEBUG] Checking local match for {degree.capitalize()} school: '{school_name}'")
+        logger.debug("Checking local match for %s school: '%s'", degree.capitalize(), school_name)
 
         # 1) Exact match check
-        if exact_match(school_name, target_school_list):
+        if exact_match(school_name, target_index):
             parsed_info[match_status_key] = 'Match'
-            print(f"[DEBUG] Exact match found locally for {degree.capitalize()} school: '{school_name}'")
+            logger.debug("Exact match found locally for %s school: '%s'", degree.capitalize(), school_name)
         else:
             # 2) Fuzzy match check
-            if fuzzy_match(school_name, target_school_list, fuzzy_threshold):
+            if fuzzy_match(school_name, target_index, fuzzy_threshold):
                 parsed_info[match_status_key] = 'Match'
-                print(f"[DEBUG] Fuzzy match (>{fuzzy_threshold}) found locally for {degree.capitalize()} school: '{school_name}'")
+                logger.debug("Fuzzy match (>%s) found locally for %s school: '%s'", fuzzy_threshold, degree.capitalize(), school_name)
             else:
                 parsed_info[match_status_key] = 'Not Match'
                 not_matched_degrees.append(degree)
-                print(f"[DEBUG] No local match for {degree.capitalize()} school: '{school_name}'. Will need OpenAI matching.")
+                logger.debug("No local match for %s school: '%s'. Will need OpenAI matching.", degree.capitalize(), school_name)
 
     return not_matched_degrees, parsed_info
 
-def extract_text_from_file(file):
-    """Extract text from various file types (.pdf, .docx, .doc) with fallback OCR."""
-    print(f"\n[INFO] Starting text extraction for file: {file}")
+# Bump whenever extraction output can change, so cached texts are re-extracted
+EXTRACTOR_VERSION = "4"
+
+# OCR settings, set once from the command line via configure_ocr()
+OCR_SETTINGS = {"dpi": 200, "max_pages": None, "workers": os.cpu_count() or 1}
+
+# Early stop for PDF/DOCX text extraction (0 = read everything) and the time limit for the
+# antiword / LibreOffice fallbacks of .doc files; set via configure_extraction()
+EXTRACT_SETTINGS = {"max_pages": 0, "max_chars": 0, "doc_timeout": 30}
+
+# Resume text is trimmed to the sections the parsing prompt needs (see sections.py)
+PROMPT_SETTINGS = {"trim": True, "max_chars": 6000}
+
+# Opt-in rule-based parsing (see fastpath.py); None = always ask OpenAI
+FAST_PATH_SETTINGS = {"extractor": None, "min_confidence": 0.9}
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def configure_ocr(dpi=200, max_pages=None, workers=None):
+    """Set OCR render DPI, page cap (None = all pages) and the number of tesseract processes."""
+    OCR_SETTINGS["dpi"] = dpi
+    OCR_SETTINGS["max_pages"] = max_pages or None
+    OCR_SETTINGS["workers"] = workers or os.cpu_count() or 1
+
+def configure_extraction(max_pages=0, max_chars=0, doc_timeout=30):
+    """
+    Stop reading a PDF/DOCX after `max_pages` pages or once `max_chars` characters were
+    collected (0 = no limit); give .doc helper programs `doc_timeout` seconds per file.
+    """
+    EXTRACT_SETTINGS["max_pages"] = max_pages or 0
+    EXTRACT_SETTINGS["max_chars"] = max_chars or 0
+    EXTRACT_SETTINGS["doc_timeout"] = doc_timeout
+
+def configure_prompt(trim=True, max_chars=6000):
+    """Turn section trimming of the parsing prompt on/off and set its size cap (0 = no cap)."""
+    PROMPT_SETTINGS["trim"] = trim
+    PROMPT_SETTINGS["max_chars"] = max_chars
+
+def configure_fast_path(references=None, min_confidence=0.9):
+    """Parse resumes locally when FastPathExtractor is at least `min_confidence` sure; None disables it."""
+    FAST_PATH_SETTINGS["extractor"] = FastPathExtractor(references) if references is not None else None
+    FAST_PATH_SETTINGS["min_confidence"] = min_confidence
+
+def extract_text_from_file(file, cache=None, digest=None):
+    """
+    Extract text from various file types (.pdf, .docx, .doc) with fallback OCR.
+    If `cache` (a cache.DiskCache) is given, texts are looked up by the file's content
+    hash and EXTRACTOR_VERSION first, so renamed copies and re-runs skip extraction.
+    `digest` is the file's cache.file_digest, if the caller already computed it.
+    """
+    logger.debug("Starting text extraction for file: %s", file)
     file_extension = os.path.splitext(file)[1].lower()
+    metrics.count("bytes", os.path.getsize(file))
+
+    cache_key = None
+    if cache:
+        cache_key = make_key("text", EXTRACTOR_VERSION, file_extension,
+                             str(OCR_SETTINGS["dpi"]), str(OCR_SETTINGS["max_pages"]),
+                             str(EXTRACT_SETTINGS["max_pages"]), str(EXTRACT_SETTINGS["max_chars"]),
+                             digest or file_digest(file))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Using cached extracted text for this file.")
+            return cached["text"]
+
+    text_content = _extract_text(file, file_extension)
+    if cache and text_content.strip():
+        cache.put(cache_key, {"text": text_content})
+    return text_content
+
+def _extract_text(file, file_extension):
+    """Dispatch to the extractor for `file_extension`."""
     text_content = ""
 
     if file_extension == ".pdf":
@@ -84,83 +159,219 @@ def extract_text_from_file(file):
     elif file_extension == ".doc":
         text_content = extract_text_from_doc(file)
     else:
-        print(f"[WARNING] Unsupported file extension '{file_extension}'. Returning empty text.")
+        logger.warning("Unsupported file extension '%s'. Returning empty text.", file_extension)
     
     return text_content
 
+# A page with less text than this that is mostly covered by images is treated as scanned
+MIN_PAGE_TEXT_CHARS = 20
+MIN_PAGE_IMAGE_COVERAGE = 0.5
+
+def _page_needs_ocr(page, page_text):
+    """True if a PDF page has (almost) no text layer but is mostly covered by images."""
+    if len(page_text.strip()) >= MIN_PAGE_TEXT_CHARS:
+        return False
+    page_area = abs(page.rect)
+    if not page_area:
+        return False
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return covered / page_area >= MIN_PAGE_IMAGE_COVERAGE
+
 def extract_text_from_pdf(file):
-    """Attempt to extract text from PDF using MuPDF, fallback to OCR if needed."""
-    print("[INFO] Detected PDF file. Trying MuPDF text extraction...")
+    """
+    Attempt to extract text from PDF using MuPDF, page by page.
+    Only pages without a usable text layer that look like scans go through OCR;
+    if MuPDF fails or finds no text at all, the whole document is OCR'd.
+    Reading stops early at EXTRACT_SETTINGS["max_pages"] / ["max_chars"], when set.
+    """
+    logger.debug("Detected PDF file. Trying MuPDF text extraction...")
     text_content = ""
+    max_chars = EXTRACT_SETTINGS["max_chars"]
     try:
-        pdf_document = fitz.open(file)
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document.load_page(page_num)
-            text_content += page.get_text()
-        
+        page_texts = []
+        scanned_pages = []
+        collected = 0
+        # Closed as soon as the text layer is read; OCR renders pages from the path on its own
+        with fitz.open(file) as pdf_document:
+            page_count = _pages_to_read(pdf_document.page_count)
+            for page_num in range(page_count):
+                page = pdf_document.load_page(page_num)
+                page_text = page.get_text()
+                if _page_needs_ocr(page, page_text):
+                    scanned_pages.append(page_num + 1)
+                page_texts.append(page_text)
+                collected += len(page_text)
+                if max_chars and collected >= max_chars:
+                    break
+            if len(page_texts) < pdf_document.page_count:
+                logger.debug("Stopped reading after %s of %s page(s).", len(page_texts), pdf_document.page_count)
+        metrics.count("pages", len(page_texts))
+
+        if scanned_pages:
+            logger.info("%s/%s page(s) look scanned. OCR'ing only those...", len(scanned_pages), len(page_texts))
+            try:
+                for page_number, ocr_text in zip(scanned_pages, ocr_pdf_pages(file, scanned_pages)):
+                    if len(ocr_text.strip()) > len(page_texts[page_number - 1].strip()):
+                        page_texts[page_number - 1] = ocr_text
+            except Exception as e:
+                # Keep whatever the text layer gave us; the full-document fallback below still applies
+                logger.error("OCR of scanned pages failed: %s", e)
+        text_content = "".join(page_texts)
+
         if len(text_content.strip()) == 0:
             raise ValueError("No text extracted from PDF via MuPDF.")
     except Exception as e:
-        print(f"[ERROR] MuPDF extraction failed: {e}")
-        print("[INFO] Falling back to OCR for PDF...")
+        logger.error("MuPDF extraction failed: %s", e)
+        logger.info("Falling back to OCR for PDF...")
         text_content = ocr_pdf(file)
     return text_content
 
+def _pages_to_read(page_count):
+    """Number of leading pages to extract, given EXTRACT_SETTINGS["max_pages"]."""
+    max_pages = EXTRACT_SETTINGS["max_pages"]
+    return min(page_count, max_pages) if max_pages else page_count
+
+def _init_ocr_worker():
+    # Each worker already gets its own page; keep tesseract from spawning extra threads on top
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def _get_ocr_pool():
+    """Process pool shared by every OCR call in this run (created on first use)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # spawn, not fork: the pool may be created while --workers threads are running
+            _ocr_pool = ProcessPoolExecutor(max_workers=OCR_SETTINGS["workers"], initializer=_init_ocr_worker,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_ocr_pool.shutdown)
+        return _ocr_pool
+
+def _ocr_page(file, page_number, dpi):
+    """Render a single PDF page and OCR it. Only one page bitmap is held in memory."""
+    images = convert_from_path(file, dpi=dpi, first_page=page_number, last_page=page_number)
+    return "".join(pytesseract.image_to_string(image) for image in images)
+
 def ocr_pdf(file):
-    """Perform OCR on a PDF file using pdf2image and pytesseract."""
-    print("[DEBUG] Performing OCR on PDF using pdf2image + pytesseract...")
-    text_content = ""
-    images = convert_from_path(file)
-    for i, image in enumerate(images, 1):
-        print(f"[DEBUG] OCR processing page {i}/{len(images)}...")
-        text_content += pytesseract.image_to_string(image)
-    return text_content
+    """
+    Perform OCR on a PDF file using pdf2image and pytesseract.
+    Pages are rendered one at a time (at OCR_SETTINGS["dpi"], up to OCR_SETTINGS["max_pages"])
+    and OCR'd in parallel on a shared process pool when more than one OCR worker is configured.
+    """
+    logger.debug("Performing OCR on PDF using pdf2image + pytesseract...")
+    page_count = _pages_to_read(pdfinfo_from_path(file)["Pages"])
+    return "".join(ocr_pdf_pages(file, range(1, page_count + 1)))
+
+def ocr_pdf_pages(file, pages):
+    """
+    OCR the given 1-based page numbers of a PDF. Returns one text per OCR'd page, in order.
+    At most OCR_SETTINGS["max_pages"] pages are OCR'd.
+    """
+    pages = list(pages)
+    max_pages = OCR_SETTINGS["max_pages"]
+    if max_pages and len(pages) > max_pages:
+        logger.debug("OCR limited to %s of %s pages.", max_pages, len(pages))
+        pages = pages[:max_pages]
+
+    dpi = OCR_SETTINGS["dpi"]
+    metrics.count("ocr_pages", len(pages))
+    with metrics.stage("ocr"):
+        if OCR_SETTINGS["workers"] > 1 and len(pages) > 1:
+            logger.debug("OCR processing %s pages on %s worker processes...", len(pages), OCR_SETTINGS['workers'])
+            return list(_get_ocr_pool().map(_ocr_page, repeat(file), pages, repeat(dpi)))
+        page_texts = []
+        for i, page_number in enumerate(pages, 1):
+            logger.debug("OCR processing page %s (%s/%s)...", page_number, i, len(pages))
+            page_texts.append(_ocr_page(file, page_number, dpi))
+        return page_texts
 
 def extract_text_from_docx(file):
-    """Extract text from .docx files using python-docx, fallback to docx2txt or OCR."""
-    print("[INFO] Detected DOCX file. Trying python-docx text extraction...")
+    """
+    Extract text from .docx files using python-docx, fallback to docx2txt or OCR.
+    Stops after EXTRACT_SETTINGS["max_chars"] characters of paragraphs, when set.
+    """
+    logger.debug("Detected DOCX file. Trying python-docx text extraction...")
     text_content = ""
+    max_chars = EXTRACT_SETTINGS["max_chars"]
     try:
         doc = Document(file)
+        paragraphs = []
+        collected = 0
         for paragraph in doc.paragraphs:
-            text_content += paragraph.text + "\n"
-        
+            paragraphs.append(paragraph.text + "\n")
+            collected += len(paragraph.text) + 1
+            if max_chars and collected >= max_chars:
+                break
+        text_content = "".join(paragraphs)
+
         if not text_content.strip():
-            print("[WARNING] No text extracted via python-docx. Trying docx2txt...")
+            logger.warning("No text extracted via python-docx. Trying docx2txt...")
             text_content = docx2txt_process(file)
             if not text_content.strip():
                 raise ValueError("No text extracted via docx2txt either.")
     except Exception as e:
-        print(f"[ERROR] DOCX extraction failed: {e}")
-        print("[INFO] Falling back to OCR for DOCX...")
+        logger.error("DOCX extraction failed: %s", e)
+        logger.info("Falling back to OCR for DOCX...")
         text_content = ocr_pdf(file)  # Using same OCR method as PDF for simplicity
     
     return text_content
 
 def extract_text_from_doc(file):
-    """Extract text from .doc files using antiword on Linux/Mac."""
-    print("[INFO] Detected DOC file. Trying antiword text extraction...")
-    if platform.system() in ["Linux", "Darwin"]:
+    """
+    Extract text from .doc files: in-process first (doc_reader, needs olefile), then with
+    antiword if it is installed. If neither finds any text (Word 6/95 files, or a scan
+    saved as .doc), the file is converted to PDF with LibreOffice and read like a PDF,
+    OCR included. Helper programs get EXTRACT_SETTINGS["doc_timeout"] seconds.
+    """
+    logger.debug("Detected DOC file. Trying in-process text extraction...")
+    text_content = ""
+    try:
+        text_content = read_doc_text(file)
+    except ImportError:
+        logger.debug("olefile is not installed; skipping in-process .doc extraction.")
+    except Exception as e:
+        logger.info("In-process .doc extraction failed: %s", e)
+
+    if not text_content.strip() and shutil.which("antiword"):
+        logger.debug("Trying antiword text extraction...")
         try:
-            result = subprocess.run(["antiword", file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            text_content = result.stdout.decode('utf-8')
+            result = subprocess.run(["antiword", file], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    timeout=EXTRACT_SETTINGS["doc_timeout"])
             if result.returncode != 0:
-                raise Exception(f"antiword error: {result.stderr.decode('utf-8')}")
+                raise Exception(f"antiword error: {result.stderr.decode('utf-8', errors='replace')}")
+            text_content = result.stdout.decode('utf-8', errors='replace')
         except Exception as e:
-            print(f"[ERROR] antiword failed: {e}. No fallback available for .doc on this platform.")
-            text_content = ""
-    else:
-        print("[WARNING] .doc file processing not supported on this platform.")
-        text_content = ""
+            logger.error("antiword failed: %s", e)
+
+    if not text_content.strip():
+        text_content = _extract_doc_via_pdf(file)
     return text_content
 
+def _extract_doc_via_pdf(file):
+    """Convert a .doc to PDF with LibreOffice and extract that (text layer or OCR); "" if not possible."""
+    soffice = shutil.which("soffice") or shutil.which("libreoffice")
+    if not soffice:
+        logger.warning("No text found in .doc file and LibreOffice is not installed to convert it for OCR.")
+        return ""
+    logger.info("No text found in .doc file. Converting it to PDF with LibreOffice...")
+    with tempfile.TemporaryDirectory(prefix="resumeclt_doc_") as tmp:
+        # A private profile, so conversions from several workers do not lock each other out
+        profile = "file://" + os.path.join(tmp, "profile").replace(os.sep, "/")
+        try:
+            subprocess.run([soffice, f"-env:UserInstallation={profile}", "--headless", "--convert-to", "pdf",
+                            "--outdir", tmp, file], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                           timeout=EXTRACT_SETTINGS["doc_timeout"], check=True)
+            pdf_file = os.path.join(tmp, os.path.splitext(os.path.basename(file))[0] + ".pdf")
+            return extract_text_from_pdf(pdf_file)
+        except Exception as e:
+            logger.error("LibreOffice conversion of .doc failed: %s", e)
+            return ""
+
 def match_schools_with_openai(parsed_info, target_school_list):
     """
     Use OpenAI to semantically match schools from the resume against a target school list.
     Updates parsed_info with match status fields.
     """
-    print("\n[INFO] Starting semantic school matching via OpenAI...")
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    logger.debug("Starting semantic school matching via OpenAI...")
 
     target_schools_str = "\n".join(target_school_list)
     phd_school = parsed_info.get('phd_school', 'NA')
@@ -202,15 +413,14 @@ def match_schools_with_openai(parsed_info, target_school_list):
     )
 
     try:
-        print("[INFO] Sending prompt for school matching to OpenAI...")
-        completion = client.chat.completions.create(
+        logger.debug("Sending prompt for school matching to OpenAI...")
+        completion = chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}]
         )
         raw_response = completion.choices[0].message.content
 
-        print("[DEBUG] Raw OpenAI school matching response:")
-        print(raw_response)
+        logger.debug("Raw OpenAI school matching response:\n%s", raw_response)
 
         cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
         cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
@@ -220,13 +430,13 @@ def match_schools_with_openai(parsed_info, target_school_list):
         parsed_info['master_match_status'] = match_results.get('master_match_status', 'Not Match')
         parsed_info['bachelor_match_status'] = match_results.get('bachelor_match_status', 'Not Match')
 
-        print("[INFO] School matching completed.")
-        print(f"[INFO] PhD School: '{phd_school}' => {parsed_info['phd_match_status']}")
-        print(f"[INFO] Master's School: '{master_school}' => {parsed_info['master_match_status']}")
-        print(f"[INFO] Bachelor's School: '{bachelor_school}' => {parsed_info['bachelor_match_status']}")
+        logger.debug("School matching completed.")
+        logger.debug("PhD School: '%s' => %s", phd_school, parsed_info['phd_match_status'])
+        logger.debug("Master's School: '%s' => %s", master_school, parsed_info['master_match_status'])
+        logger.debug("Bachelor's School: '%s' => %s", bachelor_school, parsed_info['bachelor_match_status'])
 
     except Exception as e:
-        print(f"[ERROR] Semantic school matching failed: {e}")
+        logger.error("Semantic school matching failed: %s", e)
         parsed_info['phd_match_status'] = 'Not Match'
         parsed_info['master_match_status'] = 'Not Match'
         parsed_info['bachelor_match_status'] = 'Not Match'
@@ -241,28 +451,28 @@ def determine_award_status(matched_awards):
     - If only list 2 awards are matched, return "顶会人才".
     - Otherwise, return "".
     """
-    print("[DEBUG] Determining final award status from matched awards...")
+    logger.debug("Determining final award status from matched awards...")
     list1_found = any(match.get("confidence") in ["High", "Medium"] and match.get("list") == 1 
                       for match in matched_awards)
     list2_found = any(match.get("confidence") in ["High", "Medium"] and match.get("list") == 2
                       for match in matched_awards)
 
     if list1_found and list2_found:
-        print("[DEBUG] Both list1 and list2 awards matched. Returning '高潜'.")
+        logger.debug("Both list1 and list2 awards matched. Returning '高潜'.")
         return "高潜"
     elif list1_found:
-        print("[DEBUG] Only list1 awards matched. Returning '竞赛人才'.")
+        logger.debug("Only list1 awards matched. Returning '竞赛人才'.")
         return "竞赛人才"
     elif list2_found:
-        print("[DEBUG] Only list2 awards matched. Returning '顶会人才'.")
+        logger.debug("Only list2 awards matched. Returning '顶会人才'.")
         return "顶会人才"
     else:
-        print("[DEBUG] No awards matched. Returning empty string.")
+        logger.debug("No awards matched. Returning empty string.")
         return ""
     
-def check_local_award_matches(resume_awards, award_list, award_list2, fuzzy_threshold=0.9):
+def check_local_award_matches(resume_awards, award_index, award_index2, fuzzy_threshold=0.9):
     """
-    1. For each award in resume_awards, try exact or fuzzy match against award_list (list1) and award_list2 (list2).
+    1. For each award in resume_awards, try exact or fuzzy match against award_index (list1) and award_index2 (list2).
     2. Return:
        - matched_awards: list of dicts with:
          {
@@ -273,19 +483,6 @@ def check_local_award_matches(resume_awards, award_list, award_list2, fuzzy_thre
          }
        - not_matched_awards: list of award strings still 'No Awards' after local matching.
     """
-    from difflib import SequenceMatcher
-
-    def best_local_match(award, reference_list):
-        """Return (best_match_str, best_ratio) from a reference_list for a single award."""
-        best_ratio = 0.0
-        best_match_str = None
-        for ref in reference_list:
-            ratio = SequenceMatcher(None, award.lower().strip(), ref.lower().strip()).ratio()
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_match_str = ref
-        return best_match_str, best_ratio
-
     matched_awards = []
     not_matched_awards = []
 
@@ -295,10 +492,10 @@ def check_local_award_matches(resume_awards, award_list, award_list2, fuzzy_thre
             continue
 
         # 1) Compare against award_list (list1)
-        list1_best, list1_ratio = best_local_match(aw_clean, award_list)
+        list1_best, list1_ratio = award_index.best_match(aw_clean, fuzzy_threshold)
 
         # 2) Compare against award_list2 (list2)
-        list2_best, list2_ratio = best_local_match(aw_clean, award_list2)
+        list2_best, list2_ratio = award_index2.best_match(aw_clean, fuzzy_threshold)
 
         # Decide which list this award belongs to locally
         matched_list = "No Awards"
@@ -343,7 +540,7 @@ def check_local_award_matches(resume_awards, award_list, award_list2, fuzzy_thre
 
     return matched_awards, not_matched_awards
 
-def match_awards_with_openai_partially(not_matched_awards, award_list, award_list2):
+def match_awards_with_openai_partially(not_matched_awards, award_list, award_list2, alias_store=None):
     """
     Call OpenAI to semantically match awards from 'not_matched_awards' against
     award_list (list1) and award_list2 (list2). Return a list of dicts:
@@ -356,17 +553,26 @@ def match_awards_with_openai_partially(not_matched_awards, award_list, award_lis
          }
       ]
     Then you can merge it back with the local matched results.
+    If `alias_store` (a cache.AliasStore) is given, awards OpenAI already classified in an
+    earlier resume are answered from it, and new answers are added to it.
     """
-    import os
-    import json
-    import re
-    from difflib import SequenceMatcher
-    from openai import OpenAI
-
     if not not_matched_awards:
         return []  # no partial matching needed
 
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    remembered = []
+    if alias_store is not None:
+        still_unmatched = []
+        for na in not_matched_awards:
+            known = alias_store.get(na.strip().lower())
+            if known is None:
+                still_unmatched.append(na)
+            else:
+                remembered.append(dict(known, resume_award=na))
+        if remembered:
+            logger.debug("Resolved %s award(s) from previous OpenAI answers.", len(remembered))
+        not_matched_awards = still_unmatched
+        if not not_matched_awards:
+            return remembered
 
     # Convert both lists to strings
     list1_str = "\n".join(award_list)
@@ -394,16 +600,15 @@ def match_awards_with_openai_partially(not_matched_awards, award_list, award_lis
     )
 
     try:
-        print("[INFO] Sending partial prompt for award matching to OpenAI...")
-        completion = client.chat.completions.create(
+        logger.debug("Sending partial prompt for award matching to OpenAI...")
+        completion = chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0
         )
         raw_response = completion.choices[0].message.content
 
-        print("[DEBUG] Raw partial OpenAI award matching response:")
-        print(raw_response)
+        logger.debug("Raw partial OpenAI award matching response:\n%s", raw_response)
 
         cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
         cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
@@ -412,12 +617,15 @@ def match_awards_with_openai_partially(not_matched_awards, award_list, award_lis
 
         # Just ensure it's a list of dicts with the needed keys
         final_results = []
+        answered = set()  # awards the model actually classified, the only ones worth remembering
         for item in matched_awards:
             # Minimal safety check
             resume_award = item.get("resume_award", "")
             matched_award = item.get("matched_award", "None")
             matched_list = item.get("list", "No Awards")
             confidence = item.get("confidence", "Low")
+            if "list" in item:
+                answered.add(str(resume_award).strip().lower())
             final_results.append({
                 "resume_award": resume_award,
                 "matched_award": matched_award,
@@ -425,10 +633,17 @@ def match_awards_with_openai_partially(not_matched_awards, award_list, award_lis
                 "confidence": confidence
             })
 
-        return final_results
+        if alias_store is not None:
+            asked = {na.strip().lower() for na in not_matched_awards}
+            for result in final_results:
+                key = str(result["resume_award"]).strip().lower()
+                if key in asked and key in answered:
+                    alias_store.put(key, {k: v for k, v in result.items() if k != "resume_award"})
+
+        return remembered + final_results
 
     except Exception as e:
-        print(f"[ERROR] Partial OpenAI matching failed: {e}")
+        logger.error("Partial OpenAI matching failed: %s", e)
         # If there's an error, just mark them as "No Awards"
         fallback = []
         for na in not_matched_awards:
@@ -438,17 +653,30 @@ def match_awards_with_openai_partially(not_matched_awards, award_list, award_lis
                 "list": "No Awards",
                 "confidence": "Low"
             })
-        return fallback
+        return remembered + fallback
 
 
-def match_schools_with_openai_partially(parsed_info, target_school_list, not_matched_degrees):
+def match_schools_with_openai_partially(parsed_info, target_school_list, not_matched_degrees, alias_store=None):
     """
     Call OpenAI only for degrees in `not_matched_degrees`.
     Keep existing 'Match' statuses as is, do not override them.
+    If `alias_store` (a cache.AliasStore) is given, school names OpenAI already judged in
+    an earlier resume are answered from it, and new answers are added to it.
     """
-    print("\n[INFO] Starting partial semantic school matching via OpenAI...")
+    if alias_store is not None:
+        still_unmatched = []
+        for deg in not_matched_degrees:
+            known = alias_store.get(parsed_info.get(f"{deg}_school", "NA").strip())
+            if known is None:
+                still_unmatched.append(deg)
+            else:
+                parsed_info[f"{deg}_match_status"] = known
+                logger.debug("%s school resolved from previous OpenAI answer: %s", deg.capitalize(), known)
+        not_matched_degrees = still_unmatched
+        if not not_matched_degrees:
+            return parsed_info
 
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    logger.debug("Starting partial semantic school matching via OpenAI...")
     target_schools_str = "\n".join(target_school_list)
 
     prompt_lines = []
@@ -498,15 +726,14 @@ def match_schools_with_openai_partially(parsed_info, target_school_list, not_mat
     )
 
     try:
-        print("[INFO] Sending partial prompt for school matching to OpenAI...")
-        completion = client.chat.completions.create(
+        logger.debug("Sending partial prompt for school matching to OpenAI...")
+        completion = chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}]
         )
         raw_response = completion.choices[0].message.content
 
-        print("[DEBUG] Raw partial OpenAI school matching response:")
-        print(raw_response)
+        logger.debug("Raw partial OpenAI school matching response:\n%s", raw_response)
 
         cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
         cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
@@ -520,17 +747,18 @@ def match_schools_with_openai_partially(parsed_info, target_school_list, not_mat
         if 'bachelor' in not_matched_degrees:
             parsed_info['bachelor_match_status'] = match_results.get('bachelor_match_status', 'Not Match')
 
-        print("[INFO] Partial school matching completed. Updated statuses:")
-        if 'phd' in not_matched_degrees:
-            print(f"  PhD Match: {parsed_info['phd_match_status']}")
-        if 'master' in not_matched_degrees:
-            print(f"  Master Match: {parsed_info['master_match_status']}")
-        if 'bachelor' in not_matched_degrees:
-            print(f"  Bachelor Match: {parsed_info['bachelor_match_status']}")
+        if alias_store is not None:
+            # Only answers the model gave: a status defaulted for a missing key is not remembered
+            for deg in not_matched_degrees:
+                if f"{deg}_match_status" in match_results:
+                    alias_store.put(parsed_info.get(f"{deg}_school", "NA").strip(), parsed_info[f"{deg}_match_status"])
+
+        logger.debug("Partial school matching completed. Updated statuses: %s",
+                     {deg: parsed_info[f"{deg}_match_status"] for deg in not_matched_degrees})
         return parsed_info
 
     except Exception as e:
-        print(f"[ERROR] Partial school matching failed: {e}")
+        logger.error("Partial school matching failed: %s", e)
         for deg in not_matched_degrees:
             key = f"{deg}_match_status"
             parsed_info[key] = 'Not Match'
@@ -541,8 +769,7 @@ def match_awards_with_openai(resume_awards, award_list, award_list2):
     Use OpenAI to match resume awards against two reference lists with high accuracy.
     Return a JSON list of matched results.
     """
-    print("\n[INFO] Starting award matching via OpenAI...")
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    logger.debug("Starting award matching via OpenAI...")
 
     award_list_str = "\n".join(award_list)
     award_list2_str = "\n".join(award_list2)
@@ -573,89 +800,87 @@ def match_awards_with_openai(resume_awards, award_list, award_list2):
     )
 
     try:
-        print("[INFO] Sending prompt for award matching to OpenAI...")
-        completion = client.chat.completions.create(
+        logger.debug("Sending prompt for award matching to OpenAI...")
+        completion = chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}]
         )
         raw_response = completion.choices[0].message.content
 
-        print("[DEBUG] Raw OpenAI award matching response:")
-        print(raw_response)
+        logger.debug("Raw OpenAI award matching response:\n%s", raw_response)
 
         cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
         cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
 
         matched_awards = json.loads(cleaned_content)
-        print("[INFO] Award matching completed.")
-        for m in matched_awards:
-            print(
-                f"[INFO] Resume Award: '{m.get('resume_award')}' => Matched: '{m.get('matched_award')}', "
-                f"List: {m.get('list')}, Confidence: {m.get('confidence')}"
-            )
+        logger.debug("Award matching completed.")
+        if logger.isEnabledFor(logging.DEBUG):
+            for m in matched_awards:
+                logger.debug("Resume Award: '%s' => Matched: '%s', List: %s, Confidence: %s",
+                             m.get('resume_award'), m.get('matched_award'), m.get('list'), m.get('confidence'))
         return matched_awards
 
     except Exception as e:
-        print(f"[ERROR] Award matching failed: {e}")
+        logger.error("Award matching failed: %s", e)
         return []
 
-def parse_content(text_content, target_school_list, award_list, award_list2, qs50_list):
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
-    system_message = (
-        "You are a professional-grade resume parser. "
-        "You will be provided with text content extracted from a candidate's resume. Your job is to analyze and return a JSON object containing specific fields.\n\n"
-        "Your JSON output keys:\n"
-        "1. 'education_level': The highest education level (options: '本科', '硕士', '博士', or 'N/A' if unknown). Determine based on the resume.\n"
-        "   - If the candidate has a PhD, return '博士'\n"
-        "   - If the candidate has a Master's as the highest degree, return '硕士'\n"
-        "   - If the candidate has a Bachelor's as the highest degree, return '本科'\n"
-        "   - If unsure, return 'N/A'\n\n"
-        "2. 'name': The candidate's full name as found on the resume.\n\n"
-        "3. 'major': The major (program of study) of the HIGHEST education level, in Simplified Chinese.\n\n"
-        "4. 'grad_year': The graduation year of the highest education level:\n"
-        "   - If a year range is given (e.g., '08/2022 – Present'), infer that the candidate is still studying and estimate graduation year based on:\n"
-        "     - PhD: 4 years after the start year\n"
-        "     - Master's: 2 years after the start year\n"
-        "     - Bachelor's: 4 years after the start year\n"
-        "   - If only one year is given without range, try to infer if it's start or grad year. If uncertain, assume it's the grad year.\n\n"
-        "   - If the word 'expected' is beside the year, assume it's the grad year.\n\n"
-        "5. 'phd_school', 'master_school', 'bachelor_school': The schools for each degree the candidate has, in Simplified Chinese.\n"
-        "   - If the school is known internationally and a recognized Chinese name exists, use that. Example:\n"
-        "     - 'Nanyang Technological University Singapore' -> '南洋理工大学'\n"
-        "     - 'Zhejiang University' -> '浙江大学'\n"
-        "   - If the candidate does not hold that degree level, return 'NA'.\n\n"
-        "6. 'awards': A list of awards the candidate achieved, normalized if possible.\n\n"
-        "7. 'candidate_location': The candidate's country location in Simplified Chinese. Determine by priority:\n"
-        "   1. If a location is clearly stated at the top (e.g. resume header), use the country location.\n"
-        "   2. If not found, use the highest education institution's country location.\n"
-        "   3. If the most recent work experience is more recent than the graduation year, use that work experience's country location.\n"
-        "   If none can be determined, return '未知'. Examples of countries in Simplified Chinese: '美国', '中国', '英国', etc.\n\n"
-        "8. 'is_qs50': If the highest degree institution is in top 50 QS ranking, return 'QS50'. Otherwise '非QS50'. If unsure, assume '非QS50'.\n\n"
-        "9. 'is_chinese_name': 'Yes' if the candidate's name is Chinese. Use the 百家姓 (Hundred Family Surnames) as the standard reference for identifying Chinese names. Additionally, if the name consists entirely of Chinese characters, return 'Yes' without further checks. 'No' otherwise.\n\n"
-        "10. The logic for determining the final file name outside of this function is based on these values, so ensure accuracy.\n\n"
-        "IMPORTANT: For the 'awards' key, please return them **in English** only, even if the resume is partially or fully in Chinese.\n"
-        "If you can only find Chinese award names, provide the commonly known English name or a recognized short name in English.\n"
-        "Additional Notes:\n"
-        "- Do not return 'NA' for a school if it is mentioned. Only return 'NA' if that degree level does not exist.\n"
-        "- Awards: just list them. The classification (竞赛人才, 顶会人才, 高潜) will be handled after the award matching step.\n"
-        "- Make sure the output is strictly valid JSON without extra commentary.\n"
-    )
-
-    print("[DEBUG] Sending resume text to OpenAI for structured parsing...")
-
-    completion = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+PARSE_MODEL = "gpt-3.5-turbo"
+
+PARSE_SYSTEM_MESSAGE = (
+    "You are a professional-grade resume parser. "
+    "You will be provided with text content extracted from a candidate's resume. Your job is to analyze and return a JSON object containing specific fields.\n\n"
+    "Your JSON output keys:\n"
+    "1. 'education_level': The highest education level (options: '本科', '硕士', '博士', or 'N/A' if unknown). Determine based on the resume.\n"
+    "   - If the candidate has a PhD, return '博士'\n"
+    "   - If the candidate has a Master's as the highest degree, return '硕士'\n"
+    "   - If the candidate has a Bachelor's as the highest degree, return '本科'\n"
+    "   - If unsure, return 'N/A'\n\n"
+    "2. 'name': The candidate's full name as found on the resume.\n\n"
+    "3. 'major': The major (program of study) of the HIGHEST education level, in Simplified Chinese.\n\n"
+    "4. 'grad_year': The graduation year of the highest education level:\n"
+    "   - If a year range is given (e.g., '08/2022 – Present'), infer that the candidate is still studying and estimate graduation year based on:\n"
+    "     - PhD: 4 years after the start year\n"
+    "     - Master's: 2 years after the start year\n"
+    "     - Bachelor's: 4 years after the start year\n"
+    "   - If only one year is given without range, try to infer if it's start or grad year. If uncertain, assume it's the grad year.\n\n"
+    "   - If the word 'expected' is beside the year, assume it's the grad year.\n\n"
+    "5. 'phd_school', 'master_school', 'bachelor_school': The schools for each degree the candidate has, in Simplified Chinese.\n"
+    "   - If the school is known internationally and a recognized Chinese name exists, use that. Example:\n"
+    "     - 'Nanyang Technological University Singapore' -> '南洋理工大学'\n"
+    "     - 'Zhejiang University' -> '浙江大学'\n"
+    "   - If the candidate does not hold that degree level, return 'NA'.\n\n"
+    "6. 'awards': A list of awards the candidate achieved, normalized if possible.\n\n"
+    "7. 'candidate_location': The candidate's country location in Simplified Chinese. Determine by priority:\n"
+    "   1. If a location is clearly stated at the top (e.g. resume header), use the country location.\n"
+    "   2. If not found, use the highest education institution's country location.\n"
+    "   3. If the most recent work experience is more recent than the graduation year, use that work experience's country location.\n"
+    "   If none can be determined, return '未知'. Examples of countries in Simplified Chinese: '美国', '中国', '英国', etc.\n\n"
+    "8. 'is_qs50': If the highest degree institution is in top 50 QS ranking, return 'QS50'. Otherwise '非QS50'. If unsure, assume '非QS50'.\n\n"
+    "9. 'is_chinese_name': 'Yes' if the candidate's name is Chinese. Use the 百家姓 (Hundred Family Surnames) as the standard reference for identifying Chinese names. Additionally, if the name consists entirely of Chinese characters, return 'Yes' without further checks. 'No' otherwise.\n\n"
+    "10. The logic for determining the final file name outside of this function is based on these values, so ensure accuracy.\n\n"
+    "IMPORTANT: For the 'awards' key, please return them **in English** only, even if the resume is partially or fully in Chinese.\n"
+    "If you can only find Chinese award names, provide the commonly known English name or a recognized short name in English.\n"
+    "Additional Notes:\n"
+    "- Do not return 'NA' for a school if it is mentioned. Only return 'NA' if that degree level does not exist.\n"
+    "- Awards: just list them. The classification (竞赛人才, 顶会人才, 高潜) will be handled after the award matching step.\n"
+    "- Make sure the output is strictly valid JSON without extra commentary.\n"
+)
+
+def request_parse(text_content):
+    """Send resume text to OpenAI and return the parsed JSON fields (before any matching)."""
+    logger.debug("Sending resume text to OpenAI for structured parsing...")
+
+    completion = chat_completion(
+        model=PARSE_MODEL,
         messages=[
-            {"role": "system", "content": system_message},
+            {"role": "system", "content": PARSE_SYSTEM_MESSAGE},
             {"role": "user", "content": text_content},
         ],
         temperature=0,
     )
 
     raw_response = completion.choices[0].message.content
-    print("[DEBUG] Raw OpenAI resume parsing response:")
-    print(raw_response)
+    logger.debug("Raw OpenAI resume parsing response:\n%s", raw_response)
 
     cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
     cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
@@ -663,77 +888,260 @@ def parse_content(text_content, target_school_list, award_list, award_list2, qs5
     try:
         parsed_info = json.loads(cleaned_content)
     except json.JSONDecodeError as e:
-        print(f"[ERROR] JSON decoding failed: {e}")
+        logger.error("JSON decoding failed: %s", e)
         raise ValueError("Error parsing OpenAI response")
 
-    # Local check for schools (exact/fuzzy)
-    not_matched_degrees, parsed_info = check_local_school_matches(
-        parsed_info, target_school_list, fuzzy_threshold=0.9
+    return parsed_info
+
+# Batched parsing: several resumes in one request, answered as a keyed JSON array
+PARSE_BATCH_INSTRUCTIONS = (
+    "\nBATCH MODE: The user message contains several resumes. Each one starts with a line "
+    "'=== RESUME <id> ==='. Parse every resume independently using the rules above.\n"
+    "Return a single JSON array with exactly one object per resume. Each object must contain "
+    "'resume_id' (the <id> from its header line) plus all of the keys described above.\n"
+    "Return only the JSON array, without extra commentary.\n"
+)
+
+PARSE_FIELDS = (
+    "education_level", "name", "major", "grad_year", "phd_school", "master_school",
+    "bachelor_school", "awards", "candidate_location", "is_qs50", "is_chinese_name",
+)
+
+def validate_parsed_fields(parsed_info):
+    """True if an OpenAI parse has every expected key with a usable type."""
+    if not isinstance(parsed_info, dict):
+        return False
+    if any(key not in parsed_info for key in PARSE_FIELDS):
+        return False
+    if not isinstance(parsed_info["awards"], list):
+        return False
+    return all(isinstance(parsed_info[key], str) for key in PARSE_FIELDS if key not in ("awards", "grad_year"))
+
+def request_parse_batch(texts):
+    """
+    Send several resumes in one OpenAI request. `texts` maps a resume id to its text.
+    Return {resume_id: parsed fields} for the resumes whose result passed validation;
+    missing or invalid ones are left out so the caller can parse them individually.
+    """
+    user_message = "\n\n".join(f"=== RESUME {resume_id} ===\n{text}" for resume_id, text in texts.items())
+    logger.debug("Sending a batch of %s resumes to OpenAI for structured parsing...", len(texts))
+
+    completion = chat_completion(
+        model=PARSE_MODEL,
+        messages=[
+            {"role": "system", "content": PARSE_SYSTEM_MESSAGE + PARSE_BATCH_INSTRUCTIONS},
+            {"role": "user", "content": user_message},
+        ],
+        temperature=0,
     )
 
-    if not_matched_degrees:
-        parsed_info = match_schools_with_openai_partially(parsed_info, target_school_list, not_matched_degrees)
+    raw_response = completion.choices[0].message.content
+    logger.debug("Raw OpenAI batch parsing response:\n%s", raw_response)
+
+    cleaned_content = re.sub(r"```json|```", "", raw_response).strip()
+    cleaned_content = re.sub(r",\s*([\}\]])", r"\1", cleaned_content)
+
+    try:
+        items = json.loads(cleaned_content)
+    except json.JSONDecodeError as e:
+        logger.error("Batch JSON decoding failed: %s", e)
+        return {}
+    if not isinstance(items, list):
+        logger.error("Batch response is not a JSON array.")
+        return {}
+
+    results = {}
+    duplicates = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        resume_id = str(item.pop("resume_id", ""))
+        if resume_id not in texts:
+            continue
+        if resume_id in results:
+            duplicates.add(resume_id)
+        if validate_parsed_fields(item):
+            results[resume_id] = item
+    for resume_id in duplicates:
+        # Ambiguous answer: let the single-resume path redo it
+        results.pop(resume_id, None)
+
+    logger.debug("Batch parse returned %s/%s valid result(s).", len(results), len(texts))
+    return results
+
+def fast_parse(text_content):
+    """Parsed fields from the rule-based fast path, or None if it is disabled or not confident enough."""
+    extractor = FAST_PATH_SETTINGS["extractor"]
+    if extractor is None:
+        return None
+    parsed_info, confidence = extractor.extract(text_content)
+    if confidence < FAST_PATH_SETTINGS["min_confidence"]:
+        logger.debug("Fast path confidence %s is too low; using OpenAI.", confidence)
+        return None
+    logger.debug("Parsed locally by the fast path (confidence %s).", confidence)
+    metrics.count("fast_path")
+    parsed_info["parse_source"] = "fast_path"
+    parsed_info["parse_confidence"] = confidence
+    return parsed_info
+
+def prepare_parse_text(text_content):
+    """The part of the resume text that is sent for parsing (and keys the parse cache)."""
+    if not PROMPT_SETTINGS["trim"]:
+        return text_content
+    return trim_resume_text(text_content, max_chars=PROMPT_SETTINGS["max_chars"])
+
+def _parse_cache_key(prompt_text):
+    return make_key(PARSE_MODEL, PARSE_SYSTEM_MESSAGE, prompt_text)
 
-    # Match awards & determine final award status
-    parsed_awards = parsed_info.get("awards", [])
-    if not parsed_awards:
-        # If there's no award in resume, just set status = "No Awards"
-        print("[DEBUG] No awards found in the parsed resume. Skipping award matching.")
-        parsed_info["award_status"] = "No Awards"
+def prefetch_parses(texts, caches=None, batch_size=5, max_chars=4000):
+    """
+    Parse many resumes with as few OpenAI requests as possible, before matching.
+    `texts` maps a resume id to its text. Cached resumes are read from the parse cache;
+    uncached ones whose trimmed text (prepare_parse_text) is at most `max_chars` long are
+    packed `batch_size` at a time into one request.
+    Resumes the fast path is confident about (fast_parse) are not sent at all.
+    Returns {resume_id: parsed fields}. Resumes that are too long, or whose batched result
+    failed validation, are left out, so parse_content parses them on their own.
+    """
+    caches = caches or Caches()
+    cache = caches.parse
+    prefetched = {}
+    pending = {}
+    for resume_id, text in texts.items():
+        fast = fast_parse(text)
+        if fast is not None:
+            prefetched[resume_id] = fast
+            continue
+        text = prepare_parse_text(text)
+        cached = cache.get(_parse_cache_key(text)) if cache else None
+        if cached is not None:
+            prefetched[resume_id] = cached
+        elif len(text) <= max_chars:
+            pending[resume_id] = text
+
+    pending_ids = list(pending)
+    for start in range(0, len(pending_ids), batch_size):
+        batch = {resume_id: pending[resume_id] for resume_id in pending_ids[start:start + batch_size]}
+        if len(batch) < 2:
+            break  # a lone resume goes through the regular single-resume call
+        try:
+            results = request_parse_batch(batch)
+        except Exception as e:
+            logger.error("Batch parsing request failed: %s", e)
+            continue
+        for resume_id, parsed_info in results.items():
+            prefetched[resume_id] = parsed_info
+            if cache:
+                cache.put(_parse_cache_key(batch[resume_id]), parsed_info)
+    return prefetched
+
+def parse_content(text_content, references, caches=None, parsed_fields=None):
+    """
+    Parse resume text with OpenAI, then match schools, awards and QS50 against
+    `references` (a matcher.ReferenceData loaded once at startup). Only the sections
+    the parsed fields come from are sent, up to PROMPT_SETTINGS["max_chars"].
+    If `caches` (a cache.Caches) is given, the OpenAI parse is looked up by a hash of
+    the trimmed text, system prompt and model before making the completion call, and the
+    partial OpenAI school/award matching reuses answers from earlier resumes.
+    `parsed_fields` (e.g. from prefetch_parses) skips the parsing call altogether, as does
+    a confident rule-based parse when the fast path is enabled (configure_fast_path).
+    """
+    caches = caches or Caches()
+    cache = caches.parse
+    if parsed_fields is None:
+        parsed_fields = fast_parse(text_content)
+    if parsed_fields is not None:
+        parsed_info = dict(parsed_fields)
+        logger.debug("Using prefetched or fast-path parsing result for this resume.")
     else:
-        # First do local matching
-        local_matched_awards, not_matched_awards = check_local_award_matches(
-            parsed_awards, award_list, award_list2, fuzzy_threshold=0.9
+        prompt_text = prepare_parse_text(text_content)
+        cache_key = _parse_cache_key(prompt_text)
+        parsed_info = cache.get(cache_key) if cache else None
+        if parsed_info is not None:
+            logger.debug("Using cached OpenAI parsing result for this resume.")
+        else:
+            logger.debug("Parsing prompt trimmed from %s to %s characters.", len(text_content), len(prompt_text))
+            with metrics.stage("parse"):
+                parsed_info = request_parse(prompt_text)
+            if cache and parsed_info:
+                cache.put(cache_key, parsed_info)
+
+    with metrics.stage("school_match"):
+        # Local check for schools (exact/fuzzy)
+        not_matched_degrees, parsed_info = check_local_school_matches(
+            parsed_info, references.schools, fuzzy_threshold=0.9
         )
 
-        # If some are still "No Awards" after local approach, partial GPT match them
-        if not_matched_awards:
-            partial_matches = match_awards_with_openai_partially(
-                not_matched_awards, award_list, award_list2
+        if not_matched_degrees:
+            parsed_info = match_schools_with_openai_partially(
+                parsed_info, references.schools.entries, not_matched_degrees, alias_store=caches.schools
+            )
+
+    with metrics.stage("award_match"):
+        # Match awards & determine final award status
+        parsed_awards = parsed_info.get("awards", [])
+        if not parsed_awards:
+            # If there's no award in resume, just set status = "No Awards"
+            logger.debug("No awards found in the parsed resume. Skipping award matching.")
+            parsed_info["award_status"] = "No Awards"
+        else:
+            # First do local matching
+            local_matched_awards, not_matched_awards = check_local_award_matches(
+                parsed_awards, references.awards, references.awards2, fuzzy_threshold=0.9
             )
-            # Merge partial_matches with local_matched_awards
-            # Key concept: same "resume_award" can appear in partial if it was "No Awards" locally
-            # We'll unify them by resume_award
-            partial_dict = {pm["resume_award"]: pm for pm in partial_matches}
-
-            final_matched = []
-            for item in local_matched_awards:
-                if item["list"] == "No Awards":
-                    # Overwrite from partial if found
-                    pm = partial_dict.get(item["resume_award"])
-                    if pm:
-                        final_matched.append(pm)
+
+            # If some are still "No Awards" after local approach, partial GPT match them
+            if not_matched_awards:
+                partial_matches = match_awards_with_openai_partially(
+                    not_matched_awards, references.awards.entries, references.awards2.entries,
+                    alias_store=caches.awards
+                )
+                # Merge partial_matches with local_matched_awards
+                # Key concept: same "resume_award" can appear in partial if it was "No Awards" locally
+                # We'll unify them by resume_award
+                partial_dict = {pm["resume_award"]: pm for pm in partial_matches}
+
+                final_matched = []
+                for item in local_matched_awards:
+                    if item["list"] == "No Awards":
+                        # Overwrite from partial if found
+                        pm = partial_dict.get(item["resume_award"])
+                        if pm:
+                            final_matched.append(pm)
+                        else:
+                            # Should not happen, but safe fallback
+                            final_matched.append(item)
                     else:
-                        # Should not happen, but safe fallback
+                        # If local was matched, keep local
                         final_matched.append(item)
-                else:
-                    # If local was matched, keep local
-                    final_matched.append(item)
-        else:
-            final_matched = local_matched_awards
-
-        # Now figure out the final award_status
-        has_list1 = any(m["list"] in ["1", "Both"] for m in final_matched)
-        has_list2 = any(m["list"] in ["2", "Both"] for m in final_matched)
-
-        if has_list1 and has_list2:
-            parsed_info["award_status"] = "高潜"
-        elif has_list1:
-            parsed_info["award_status"] = "竞赛人才"
-        elif has_list2:
-            parsed_info["award_status"] = "顶会人才"
-        else:
-            parsed_info["award_status"] = "No Awards"                          
-    
-    parsed_info["is_qs50"] = determine_qs50(parsed_info, qs50_list)
+            else:
+                final_matched = local_matched_awards
 
-    print("[DEBUG] Completed parse_content flow. Returning parsed_info.")
+            # Keep the per-award match details for the results file
+            parsed_info["award_matches"] = final_matched
+
+            # Now figure out the final award_status
+            has_list1 = any(m["list"] in ["1", "Both"] for m in final_matched)
+            has_list2 = any(m["list"] in ["2", "Both"] for m in final_matched)
+
+            if has_list1 and has_list2:
+                parsed_info["award_status"] = "高潜"
+            elif has_list1:
+                parsed_info["award_status"] = "竞赛人才"
+            elif has_list2:
+                parsed_info["award_status"] = "顶会人才"
+            else:
+                parsed_info["award_status"] = "No Awards"
+
+    parsed_info["is_qs50"] = determine_qs50(parsed_info, references.qs50)
+
+    logger.debug("Completed parse_content flow. Returning parsed_info.")
     return parsed_info
 
-def determine_qs50(parsed_info, qs50_list, fuzzy_threshold=0.9):
+def determine_qs50(parsed_info, qs50_index, fuzzy_threshold=0.9):
     """
     Override 'is_qs50' by checking if the highest education institution
-    is in your local qs50_list. Return 'QS50' or '非QS50'.
+    is in your local qs50 list. Return 'QS50' or '非QS50'.
     Use fuzzy matching if exact match fails.
     """
 
@@ -752,14 +1160,12 @@ def determine_qs50(parsed_info, qs50_list, fuzzy_threshold=0.9):
         return "非QS50"
 
     # 1) Check for exact match
-    if highest_school in qs50_list:
+    if qs50_index.contains(highest_school):
         return "QS50"
 
     # 2) Check for fuzzy match
-    for qs_school in qs50_list:
-        ratio = SequenceMatcher(None, highest_school, qs_school).ratio()
-        if ratio >= fuzzy_threshold:
-            return "QS50"
+    if qs50_index.fuzzy_contains(highest_school, fuzzy_threshold):
+        return "QS50"
 
     return "非QS50"
 
@@ -776,7 +1182,7 @@ def generate_filename(parsed_info, args):
     Format:
     [MatchStatus]-[JobType]-[EducationLevelCH]-[Name]-[School]-[Major]-[GradYear]-[AwardStatus(optional)]-[CandidateLocation]-[QS50(if applicable)]
     """
-    print("[DEBUG] Generating the final filename based on parsed_info...")
+    logger.debug("Generating the final filename based on parsed_info...")
 
     name = sanitize_filename_component(parsed_info.get("name", "Unknown Name"))
     major = sanitize_filename_component(parsed_info.get("major", "Unknown Major"))
@@ -851,5 +1257,5 @@ def generate_filename(parsed_info, args):
         components.append(qs50_label)
 
     filename = "-".join(filter(None, components))
-    print(f"[DEBUG] Final filename: '{filename}'")
+    logger.debug("Final filename: '%s'", filename)
     return filename